@@ -0,0 +1,278 @@
+"""Detection benchmark for POST /api/analyze-event: latency against message length and obfuscation, plus recall.
+
+Every chat message runs through detection/obfuscation.ts, regex.ts and keywords.ts before
+signals are generated. This driver generates a seeded corpus of clean chat and of messages
+that share a phone number or email address, either plainly or obfuscated. The obfuscations
+are spelled-out, spaced, separated, circled/keycap and fullwidth digits, and [at]/[dot],
+spaced-out and Cyrillic look-alike emails. Every type is embedded in filler chat padded to
+each of --lengths characters. Two adversarial types with no contact in them, a long unbroken
+token and a long run of spaced letters, target the backtracking patterns: a regex that
+rescans the rest of the message from every position turns quadratic. For each type the
+report gives p50 latency per length and the growth exponent between the two longest
+lengths (1 is linear, 2 quadratic). It also gives recall of the expected signal, or the
+contact false-positive rate for types that carry none.
+
+By default messages come from a fresh sender/receiver pair that is not in users, so the
+risk_signals insert fails its foreign key and no real user collects signals (the backend
+logs each failure). Pass --sender/--receiver to exercise the persist path as well. The
+global limiter allows RATE_LIMIT_MAX (100) requests a minute; raise it on the target or
+lower --per-cell, since throttled requests are counted but not timed.
+
+    python bench_analyze.py --lengths 100,1000,4000,16000 --per-cell 10
+    python bench_analyze.py --write-corpus corpus.jsonl --per-cell 200
+    python bench_analyze.py --corpus corpus.jsonl --types clean,spaced_email
+    python bench_analyze.py --stub
+"""
+import argparse, collections, json, math, random, statistics, string, sys, time, uuid
+
+import test_dashboard as td
+from bench_evaluate import signed_headers
+from cis_runner import summarize
+
+ANALYZE = '/api/analyze-event'
+CONTACT_SIGNALS = {'CONTACT_PHONE', 'CONTACT_EMAIL', 'CONTACT_SOCIAL'}
+FILLER = [
+    'Hi, thanks for booking with me.', 'I can come by on Tuesday afternoon if that works for you.',
+    'The job should take about two hours, maybe a bit more.', 'Please make sure the water is turned off before I arrive.',
+    'Do you have parking near the building?', 'I will bring all the tools and materials we discussed.',
+    'Let me know if the gate code has changed.', 'The quote covers labour and the replacement parts.',
+    'Could you upload a photo of the area through the app?', 'Running about ten minutes late, sorry about that.',
+    'All done, thanks again and have a great weekend.', 'Is the kitchen or the bathroom the priority?',
+]
+DIGIT_WORDS = ['zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+FIRST = ['john', 'maria', 'kwame', 'lucia', 'david', 'sarah', 'mike', 'amina', 'tom', 'priya']
+LAST = ['smith', 'chen', 'asante', 'fernandez', 'kim', 'nguyen', 'thompson', 'okafor', 'garcia', 'patel']
+DOMAINS = [('gmail', 'com'), ('yahoo', 'com'), ('outlook', 'com'), ('proton', 'me'), ('icloud', 'com')]
+HOMOGLYPHS = {'a': 'а', 'c': 'с', 'e': 'е', 'i': 'і', 'o': 'о', 'p': 'р', 'x': 'х', 'y': 'у'}  # Cyrillic
+
+
+def phone_digits(rng):
+    """Ten NANP-shaped digits."""
+    return [rng.randrange(2, 10), rng.randrange(10), rng.randrange(10), rng.randrange(2, 10)] + \
+        [rng.randrange(10) for _ in range(6)]
+
+
+def formatted(d):
+    return '{}{}{}-{}{}{}-{}{}{}{}'.format(*d)
+
+
+def email_parts(rng):
+    name, domain = rng.choice(FIRST), rng.choice(DOMAINS)
+    return f'{name}.{rng.choice(LAST)}', name + rng.choice(LAST), domain
+
+
+def plain_email(rng):
+    local, _, (host, tld) = email_parts(rng)
+    return f'{local}{rng.randrange(100)}@{host}.{tld}'
+
+
+def at_dot_email(rng):
+    _, letters, (host, tld) = email_parts(rng)
+    at, dot = rng.choice([('[at]', '[dot]'), ('(at)', '(dot)'), ('{at}', '{dot}'), ('at', 'dot')])
+    return f'{letters} {at} {host} {dot} {tld}'
+
+
+def spaced_email(rng):
+    _, letters, (host, tld) = email_parts(rng)
+    at, dot = rng.choice([('@', '.'), ('at', 'dot')])
+    return f'{" ".join(letters)} {at} {" ".join(host)} {dot} {" ".join(tld)}'
+
+
+def homoglyph_email(rng):
+    local, _, (host, tld) = email_parts(rng)
+    spots = [i for i, c in enumerate(host) if c in HOMOGLYPHS]
+    swap = set(rng.sample(spots, max(1, len(spots) // 2))) if spots else set()
+    host = ''.join(HOMOGLYPHS[c] if i in swap else c for i, c in enumerate(host))
+    local = ''.join(HOMOGLYPHS[c] if c in HOMOGLYPHS and rng.random() < 0.3 else c for c in local)
+    return f'{local}@{host}.{tld}'
+
+
+def emoji_digits(rng):
+    d = phone_digits(rng)
+    if rng.random() < 0.5:
+        return ''.join('⓪' if x == 0 else chr(0x245f + x) for x in d)  # circled
+    return ''.join(f'{x}️⃣' for x in d)  # keycap
+
+
+# type -> (snippet generator, expected signal); None marks types that must not raise a contact signal
+TYPES = {
+    'clean': (None, None),
+    'phone': (lambda rng: formatted(phone_digits(rng)), 'CONTACT_PHONE'),
+    'spelled_digits': (lambda rng: rng.choice([' ', ', ', '-', ' . ']).join(DIGIT_WORDS[x] for x in phone_digits(rng)),
+                       'CONTACT_PHONE'),
+    'spaced_digits': (lambda rng: ' '.join(map(str, phone_digits(rng))), 'CONTACT_PHONE'),
+    'separated_digits': (lambda rng: rng.choice('.-|_/').join(map(str, phone_digits(rng))), 'CONTACT_PHONE'),
+    'emoji_digits': (emoji_digits, 'CONTACT_PHONE'),
+    'fullwidth_digits': (lambda rng: ''.join(chr(0xff10 + int(c)) if c.isdigit() else c
+                                              for c in formatted(phone_digits(rng))), 'CONTACT_PHONE'),
+    'email': (plain_email, 'CONTACT_EMAIL'),
+    'at_dot_email': (at_dot_email, 'CONTACT_EMAIL'),
+    'spaced_email': (spaced_email, 'CONTACT_EMAIL'),
+    'homoglyph_email': (homoglyph_email, 'CONTACT_EMAIL'),
+    'long_token': (None, None),
+    'spaced_letters': (None, None),
+}
+INTROS = ['reach me on', 'here you go:', 'this one works best:', 'use', 'got it, its']
+
+
+def message(kind, length, rng):
+    """One corpus message of roughly `length` characters."""
+    if kind == 'long_token':
+        return 'ref ' + ''.join(rng.choices(string.ascii_lowercase + string.digits + '._', k=length))
+    if kind == 'spaced_letters':
+        return 'ref ' + ' '.join(rng.choices(string.ascii_lowercase, k=max(1, length // 2)))
+    make = TYPES[kind][0]
+    snippet = f'{rng.choice(INTROS)} {make(rng)}.' if make else ''
+    sentences = []
+    while sum(len(s) + 1 for s in sentences) + len(snippet) < length:
+        sentences.append(rng.choice(FILLER))
+    if snippet:
+        sentences.insert(rng.randrange(len(sentences) + 1), snippet)
+    return ' '.join(sentences)
+
+
+def generate(kinds, lengths, per_cell, rng):
+    for kind in kinds:
+        for length in lengths:
+            for _ in range(per_cell):
+                yield {'type': kind, 'target': length, 'expect': TYPES[kind][1], 'text': message(kind, length, rng)}
+
+
+def analyze(item, sender, receiver, token, timeout):
+    body = json.dumps({'id': str(uuid.uuid4()), 'type': 'message.created',
+                       'payload': {'message_id': str(uuid.uuid4()), 'sender_id': sender, 'receiver_id': receiver,
+                                   'content': item['text'], 'bench': True}},
+                      separators=(',', ':'), ensure_ascii=False).encode()
+    headers = {'Content-Type': 'application/json', 'Authorization': 'Bearer ' + token} if token \
+        else signed_headers(body)
+    t0 = time.perf_counter()
+    status, _, data = td.POOL.request('POST', ANALYZE, headers, body, timeout)
+    elapsed = time.perf_counter() - t0
+    found, server_ms = set(), None
+    if status == 200:
+        try:
+            result = json.loads(data)
+            found = {s['signal_type'] for s in result.get('signals', [])}
+            server_ms = float(result.get('processing_time_ms', 0))
+        except (ValueError, TypeError, KeyError):
+            status = -1
+    return {'type': item['type'], 'target': item['target'], 'length': len(item['text']), 'status': status,
+            'elapsed': elapsed, 'server_ms': server_ms, 'hit': item['expect'] in found if item['expect'] else None,
+            'false_contact': sorted(found & CONTACT_SIGNALS) if not item['expect'] else []}
+
+
+def growth(cells, overhead):
+    """Exponent of latency in length between the two longest lengths, after the fixed per-request overhead."""
+    points = [(statistics.mean(r['length'] for r in rows), statistics.median(r['elapsed'] for r in rows) - overhead)
+              for _, rows in sorted(cells.items()) if rows]
+    if len(points) < 2:
+        return None, 0.0
+    (l1, t1), (l2, t2) = points[-2:]
+    if t1 <= 0 or t2 <= 0 or l2 <= l1:
+        return None, max(t2, 0.0)
+    return math.log(t2 / t1) / math.log(l2 / l1), t2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Latency and recall benchmark for /api/analyze-event')
+    parser.add_argument('--types', default=','.join(TYPES), help='comma-separated corpus types')
+    parser.add_argument('--lengths', default='100,1000,4000,16000', help='message lengths in characters')
+    parser.add_argument('--per-cell', type=int, default=10, help='messages per type and length')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the corpus generator')
+    parser.add_argument('--write-corpus', metavar='FILE', help='write the generated corpus as JSON lines and exit')
+    parser.add_argument('--corpus', metavar='FILE', help='replay a corpus written by --write-corpus')
+    parser.add_argument('--sender', help='sender user id (default: a fresh id not in users)')
+    parser.add_argument('--receiver', help='receiver user id (default: a fresh id not in users)')
+    parser.add_argument('--max-growth', type=float, default=1.5, help='flag types whose latency grows faster than this')
+    parser.add_argument('--noise-ms', type=float, default=5, help='ignore growth when the longest cell costs less than this')
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout in seconds')
+    parser.add_argument('--jwt', action='store_true', help='authenticate with the admin JWT instead of HMAC')
+    parser.add_argument('--stub', action='store_true', help='benchmark an in-process cis_stub_server')
+    args = parser.parse_args(argv)
+    kinds = [k for k in args.types.split(',') if k]
+    unknown = set(kinds) - set(TYPES)
+    if unknown:
+        parser.error(f'unknown types: {", ".join(sorted(unknown))}')
+    lengths = sorted(int(n) for n in args.lengths.split(',') if n.strip())
+
+    if args.corpus:
+        with open(args.corpus, encoding='utf-8') as f:
+            corpus = [item for item in map(json.loads, f) if item['type'] in kinds]
+    else:
+        corpus = list(generate(kinds, lengths, args.per_cell, random.Random(args.seed)))
+    if args.write_corpus:
+        with open(args.write_corpus, 'w', encoding='utf-8') as f:
+            for item in corpus:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        print(f'Wrote {len(corpus)} messages to {args.write_corpus}.')
+        return 0
+
+    td.connect(args.stub)
+    token = td.login() if args.jwt else None
+    sender, receiver = args.sender or str(uuid.uuid4()), args.receiver or str(uuid.uuid4())
+    # Interleave types so drift in the backend does not land on one of them
+    random.Random(args.seed).shuffle(corpus)
+    print('=' * 60)
+    print(f'CIS ANALYZE BENCHMARK -- {len(corpus)} messages, {len(kinds)} types')
+    print('=' * 60)
+    results = []
+    try:
+        for item in corpus:
+            results.append(analyze(item, sender, receiver, token, args.timeout))
+    finally:
+        td.POOL.close()
+
+    ok = [r for r in results if r['status'] == 200]
+    throttled = sum(1 for r in results if r['status'] == 429)
+    errors = len(results) - len(ok) - throttled
+    shortest = [r['elapsed'] for r in ok if r['type'] == 'clean' and r['target'] == min(r['target'] for r in ok)]
+    overhead = statistics.median(shortest) if shortest else 0.0
+    targets = sorted({r['target'] for r in ok})
+    print(f'  p50 latency by message length; fixed overhead {overhead * 1000:.1f}ms (shortest clean messages)')
+    print(f'  {"type":<18}{"detect":>9}' + ''.join(f'{t:>10}' for t in targets) + f'{"srv p50":>10}{"growth":>8}')
+    flagged = []
+    for kind in kinds:
+        rows = [r for r in ok if r['type'] == kind]
+        if not rows:
+            continue
+        cells = {t: [r for r in rows if r['target'] == t] for t in targets}
+        if TYPES[kind][1]:
+            detect = f'{sum(r["hit"] for r in rows) / len(rows):.0%}'
+        else:
+            detect = f'fp {sum(bool(r["false_contact"]) for r in rows) / len(rows):.0%}'
+        p50 = ''.join(f'{summarize([r["elapsed"] for r in cells[t]])["p50"]:>8.1f}ms' if cells[t] else f'{"-":>10}'
+                      for t in targets)
+        longest = cells[targets[-1]] or rows
+        server = [r['server_ms'] for r in longest if r['server_ms'] is not None]
+        exponent, excess = growth(cells, overhead)
+        verdict = ''
+        if exponent is not None and exponent > args.max_growth and excess * 1000 >= args.noise_ms:
+            verdict = '  SUPER-LINEAR'
+            flagged.append(kind)
+        shown = f'{exponent:>8.2f}' if exponent is not None else f'{"-":>8}'
+        print(f'  {kind:<18}{detect:>9}{p50}{statistics.median(server) if server else 0:>8.0f}ms{shown}{verdict}')
+
+    print('=' * 60)
+    expected = [r for r in ok if r['hit'] is not None]
+    clean = [r for r in ok if r['hit'] is None]
+    if expected:
+        print(f'  recall {sum(r["hit"] for r in expected) / len(expected):.1%} over {len(expected)} contact messages')
+    if clean:
+        raised = collections.Counter(t for r in clean for t in r['false_contact'])
+        print(f'  contact false positives {sum(bool(r["false_contact"]) for r in clean) / len(clean):.1%} '
+              f'over {len(clean)} messages without contact details'
+              + (f' ({", ".join(f"{t} {n}" for t, n in raised.most_common())})' if raised else ''))
+    missed = sorted({r['type'] for r in expected if not r['hit']})
+    if missed:
+        print(f'  missed contacts in: {", ".join(missed)}')
+    if throttled:
+        print(f'  {throttled} request(s) throttled (HTTP 429); raise RATE_LIMIT_MAX or lower --per-cell')
+    if errors:
+        print(f'  {errors} request(s) failed')
+    if flagged:
+        print(f'  latency grows faster than length^{args.max_growth:g} for: {", ".join(flagged)}')
+    return 1 if flagged or errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""Write-contention test for POST /api/cases/:id/notes on one hot case.
+
+The dashboard suite adds a single case note. In production several analysts annotate the same
+case at once while detection and enforcement fire for the case's user. This driver points
+--writers concurrent writers at one case, --readers analysts re-reading it, and optionally a
+stream of --triggers events for the case's user. It then verifies the case_notes rows.
+
+Notes cannot be deleted through the API, so the case must be named with --case; only --stub
+picks one (its first open case) automatically.
+
+Each note carries a unique marker (run tag, writer, sequence). After the run the case is read
+back, and every marker is reconciled against what the server acknowledged:
+- lost: acknowledged with 201 but missing
+- duplicated: stored more than once
+- phantom: stored although the write returned an error
+Readers also check that every note acknowledged before their read began is in the read.
+
+A short serial --baseline phase measures uncontended write latency first. Lock waits under
+contention then show up as tail latency over that baseline.
+
+--triggers sends message.created events that share a phone number, from the case's user to
+another user. Each runs detection, scoring and (shadow) enforcement, and writes risk_signals
+for a real user, so it is off by default. The global limiter allows RATE_LIMIT_MAX (100)
+requests a minute; raise it on the target, or throttled writes are reported as failed.
+
+    python bench_case_notes.py --case <uuid> --writers 16 --notes 400 --readers 4
+    python bench_case_notes.py --case <uuid> --triggers 50
+    python bench_case_notes.py --stub
+"""
+import argparse, collections, json, random, sys, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import test_dashboard as td
+from bench_analyze import message
+from cis_runner import summarize
+
+EVENTS = '/api/events'
+
+
+class Ledger:
+    """Every note sent, keyed by its marker, plus read and trigger outcomes; shared by all workers."""
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.lock = threading.Lock()
+        self.sent = {}        # marker -> HTTP status of its write
+        self.acked = set()
+        self.writes = collections.defaultdict(list)  # phase -> latencies of acknowledged writes
+        self.reads = []
+        self.stale_reads = 0
+        self.read_errors = collections.Counter()
+        self.triggers = collections.Counter()
+        self.trigger_latency = []
+
+    def marker(self, writer, seq):
+        return f'[{self.tag} w{writer:03d}-{seq:05d}]'
+
+    def write(self, case, writer, seq, phase, token, timeout):
+        mark = self.marker(writer, seq)
+        t0 = time.perf_counter()
+        code, _ = td.curl('POST', f'/api/cases/{case}/notes', token,
+                          data={'content': f'Contention test note {mark}'}, timeout=timeout)
+        elapsed = time.perf_counter() - t0
+        with self.lock:
+            self.sent[mark] = code
+            if code == 201:
+                self.acked.add(mark)
+                self.writes[phase].append(elapsed)
+
+    def read(self, case, token, timeout):
+        with self.lock:
+            before = set(self.acked)
+        t0 = time.perf_counter()
+        code, body = td.curl('GET', f'/api/cases/{case}', token, timeout=timeout)
+        elapsed = time.perf_counter() - t0
+        with self.lock:
+            if code != 200:
+                self.read_errors[code] += 1
+                return
+            self.reads.append(elapsed)
+            if any(m not in body for m in before):
+                self.stale_reads += 1
+
+
+def reconcile(ledger, notes):
+    """Lost, duplicated, phantom and out-of-order markers among the case's notes, in created_at order."""
+    seen = collections.Counter()
+    order = collections.defaultdict(list)
+    for n in notes:
+        content = n.get('content') or ''
+        at = content.find(f'[{ledger.tag} w')
+        if at < 0:
+            continue
+        mark = content[at:content.index(']', at) + 1]
+        seen[mark] += 1
+        writer, seq = mark[len(ledger.tag) + 3:-1].split('-')
+        order[writer].append(int(seq))
+    ids = collections.Counter(n.get('id') for n in notes)
+    return {'stored': sum(seen.values()),
+            'lost': sorted(ledger.acked - set(seen)),
+            'duplicated': sorted(m for m, k in seen.items() if k > 1),
+            'phantom': sorted(m for m in seen if m not in ledger.acked),
+            'duplicate_ids': sorted(i for i, k in ids.items() if k > 1),
+            'out_of_order': sorted(w for w, seqs in order.items() if seqs != sorted(seqs))}
+
+
+def trigger_events(user, other, n, rng):
+    """n message.created bodies from `user` that each carry a phone number, so detection fires."""
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    conversation = str(uuid.uuid5(uuid.NAMESPACE_OID, user + other))
+    return [json.dumps({'id': str(uuid.uuid4()), 'type': 'message.created', 'correlation_id': str(uuid.uuid4()),
+                        'timestamp': now,
+                        'payload': {'message_id': str(uuid.uuid4()), 'sender_id': user, 'receiver_id': other,
+                                    'conversation_id': conversation, 'content': message('phone', 120, rng)}},
+                       separators=(',', ':')).encode() for _ in range(n)]
+
+
+def pick_case(token, case_id):
+    """(case id, user id) of --case, else (stub only) of the first open case, else of any case."""
+    if case_id:
+        code, body = td.curl('GET', f'/api/cases/{case_id}', token)
+        return (case_id, json.loads(body)['data'].get('user_id')) if code == 200 else (None, None)
+    for path in ('/api/cases?status=open&limit=1', '/api/cases?limit=1'):
+        code, body = td.curl('GET', path, token)
+        rows = json.loads(body).get('data', []) if code == 200 else []
+        if rows:
+            return rows[0]['id'], rows[0].get('user_id')
+    return None, None
+
+
+def run(case, user, token, args):
+    ledger = Ledger(uuid.uuid4().hex[:8])
+    for seq in range(args.baseline):
+        ledger.write(case, 0, seq, 'baseline', token, args.timeout)
+
+    triggers = []
+    if args.triggers and user:
+        code, body = td.curl('GET', '/api/users?limit=10', token)
+        others = [u['id'] for u in json.loads(body).get('data', []) if u['id'] != user] if code == 200 else []
+        if others:
+            triggers = trigger_events(user, others[0], args.triggers, random.Random(args.seed))
+        else:
+            print('  no second user to address trigger messages to; --triggers skipped')
+
+    per_writer = [args.notes // args.writers + (1 if w < args.notes % args.writers else 0) for w in range(args.writers)]
+    writing = threading.Event()
+    writing.set()
+
+    def writer(w):
+        for seq in range(per_writer[w]):
+            ledger.write(case, w + 1, seq, 'contended', token, args.timeout)
+
+    def reader(_):
+        while writing.is_set():
+            ledger.read(case, token, args.timeout)
+
+    def trigger(body):
+        t0 = time.perf_counter()
+        code, _, _ = td.POOL.request('POST', EVENTS, {'Authorization': 'Bearer ' + token,
+                                                      'Content-Type': 'application/json'}, body, args.timeout)
+        with ledger.lock:
+            ledger.triggers[code] += 1
+            if code == 202:
+                ledger.trigger_latency.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.readers + 1) as side:
+        readers = [side.submit(reader, r) for r in range(args.readers)]
+        fired = side.submit(lambda: [trigger(b) for b in triggers])
+        with ThreadPoolExecutor(max_workers=args.writers) as pool:
+            list(pool.map(writer, range(args.writers)))
+        writing.clear()
+        for f in readers + [fired]:
+            f.result()
+    wall = time.perf_counter() - t0
+
+    code, body = td.curl('GET', f'/api/cases/{case}', token)
+    notes = json.loads(body).get('data', {}).get('notes', []) if code == 200 else None
+    return ledger, wall, notes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write-contention test for concurrent notes on one case')
+    parser.add_argument('--case', help='case id to annotate; required unless --stub (default there: first open case)')
+    parser.add_argument('--writers', type=int, default=16, help='concurrent note writers')
+    parser.add_argument('--notes', type=int, default=200, help='notes written under contention, split across writers')
+    parser.add_argument('--readers', type=int, default=4, help='concurrent GET /api/cases/:id readers during the writes')
+    parser.add_argument('--baseline', type=int, default=10, help='serial notes written first for uncontended latency')
+    parser.add_argument('--triggers', type=int, default=0,
+                        help='contact-bearing message.created events for the case user, sent during the writes')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the trigger message generator')
+    parser.add_argument('--timeout', type=float, default=None, help='per-request timeout in seconds')
+    parser.add_argument('--stub', action='store_true', help='test an in-process cis_stub_server')
+    args = parser.parse_args(argv)
+    if not args.case and not args.stub:
+        parser.error('--case is required: the test notes cannot be removed, so name a case set aside for it')
+    if args.writers < 1 or args.notes < args.writers:
+        parser.error('--notes must be at least --writers, and --writers at least 1')
+
+    td.connect(args.stub, size=args.writers + args.readers + 2)
+    try:
+        token = td.login()
+        if token is None:
+            return 1
+        case, user = pick_case(token, args.case)
+        if case is None:
+            print(f'Case {args.case} not found.' if args.case else 'No case on this backend to annotate.')
+            return 1
+        print('=' * 60)
+        print(f'CIS CASE-NOTE CONTENTION -- {args.notes} notes from {args.writers} writers on case {case}, '
+              f'{args.readers} readers' + (f', {args.triggers} triggers' if args.triggers else ''))
+        print('=' * 60)
+        ledger, wall, notes = run(case, user, token, args)
+    finally:
+        td.POOL.close()
+
+    base, hot = summarize(ledger.writes['baseline']), summarize(ledger.writes['contended'])
+    fmt = lambda s: f'p50 {s["p50"]:.1f}ms p95 {s["p95"]:.1f}ms p99 {s["p99"]:.1f}ms max {s["max"]:.1f}ms'
+    failed = collections.Counter(code for code in ledger.sent.values() if code != 201)
+    failures = ', '.join(f'HTTP {code or "error"} x{n}' for code, n in failed.items())
+    print(f'  writes: {len(ledger.acked)}/{len(ledger.sent)} acknowledged in {wall:.2f}s '
+          f'({hot["n"] / wall:.0f}/s under contention)' + (f'; failed {failures}' if failed else ''))
+    if base['n']:
+        print(f'    uncontended  {fmt(base)}')
+    print(f'    contended    {fmt(hot)}')
+    if base['n'] and base['p50']:
+        print(f'    tail inflation: contended p99 is {hot["p99"] / base["p50"]:.1f}x the uncontended p50')
+    reads = summarize(ledger.reads)
+    print(f'  reads: {reads["n"]} during the writes, {fmt(reads)}; {ledger.stale_reads} missed an acknowledged note'
+          + (f'; errors {dict(ledger.read_errors)}' if ledger.read_errors else ''))
+    if ledger.triggers:
+        print(f'  triggers: {dict(ledger.triggers)}, accepted {fmt(summarize(ledger.trigger_latency))}')
+
+    print('-' * 60)
+    if notes is None:
+        print('  could not read the case back; notes not verified')
+        return 1
+    r = reconcile(ledger, notes)
+    print(f'  {r["stored"]} notes of this run stored on the case')
+    problems = []
+    for key, label in (('lost', 'acknowledged but missing'), ('duplicated', 'stored more than once'),
+                       ('duplicate_ids', 'note ids repeated')):
+        if r[key]:
+            problems.append(key)
+            print(f'  {len(r[key])} {label}: {", ".join(r[key][:5])}{" ..." if len(r[key]) > 5 else ""}')
+    if r['phantom']:
+        print(f'  {len(r["phantom"])} stored although the write failed (client timeout or dropped response)')
+    if r['out_of_order']:
+        print(f'  writers whose notes are out of created_at order: {", ".join(r["out_of_order"])}')
+    if ledger.stale_reads:
+        problems.append('stale reads')
+    if failed:
+        problems.append('failed writes')
+    print('=' * 60)
+    print(f'Problems: {", ".join(problems)}.' if problems else 'No notes lost or duplicated; every read saw its acknowledged notes.')
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
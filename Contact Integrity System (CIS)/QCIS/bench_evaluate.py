@@ -0,0 +1,228 @@
+"""Decision-latency benchmark for POST /api/evaluate, the inline booking/payment check.
+
+CISEvaluateBooking and CISEvaluatePayment call /api/evaluate before every checkout with a 200ms
+client timeout, so its latency is checkout latency. This driver generates booking.create and
+payment.initiate payloads in bulk from a seeded RNG, shaped like the middlewares' metadata,
+for a configurable mix of users: new (no risk score), low (<40), medium (40-70) and high (>=70).
+It signs them like a service (X-HMAC-Signature over "timestamp.body") and replays them at each
+concurrency step. The report gives latency percentiles per returned decision and the
+requests over the --slo-ms ceiling.
+
+Every call writes an evaluation_log row, and medium/high users can create (shadow) enforcement
+actions, so the default mix only uses new and low-risk users. Payload metadata carries
+"bench": true so the rows can be told apart.
+
+    python bench_evaluate.py --concurrency 1,8,32 --requests 2000 --mix new=0.6,low=0.3,medium=0.1
+    python bench_evaluate.py --stub
+"""
+import argparse, collections, hashlib, hmac, json, math, os, random, sys, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import test_dashboard as td
+from cis_paging import PageWalker
+from cis_runner import summarize
+
+HMAC_SECRET = os.environ.get('CIS_HMAC_SECRET', 'dev_hmac_secret_change_in_production')
+EVALUATE = '/api/evaluate'
+BANDS = ('new', 'low', 'medium', 'high')
+SERVICES = ['Cleaning', 'Plumbing', 'Electrical', 'Moving', 'Tutoring', 'Landscaping', 'Handyman', 'Beauty']
+PAYMENT_METHODS = (['card', 'wallet', 'bank_transfer', 'cash'], [0.6, 0.25, 0.1, 0.05])
+USER_AGENTS = ['QwickServices/4.2 (iOS 17.5)', 'QwickServices/4.2 (Android 14)',
+               'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/126.0 Safari/537.36']
+
+
+def parse_mix(text, names):
+    """'a=0.7,b=0.3' -> {'a': 0.7, 'b': 0.3}, normalised to sum to 1."""
+    mix = {}
+    for part in filter(None, text.split(',')):
+        name, _, weight = part.partition('=')
+        if name not in names:
+            raise ValueError(f'unknown mix entry {name!r} (expected one of {", ".join(names)})')
+        mix[name] = float(weight or 1)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError('mix weights must sum to more than zero')
+    return {k: v / total for k, v in mix.items()}
+
+
+def band_of(score):
+    return 'low' if score < 40 else 'medium' if score < 70 else 'high'
+
+
+def scored_users():
+    """{band: [user ids]} from /api/risk-scores, keeping each user's latest score."""
+    token = td.login()
+    latest = {}
+    for row in PageWalker(lambda path: td.curl('GET', path, token), '/api/risk-scores'):
+        uid = row.get('user_id')
+        if uid and (uid not in latest or row.get('created_at', '') > latest[uid][0]):
+            latest[uid] = (row.get('created_at', ''), float(row.get('score') or 0))
+    bands = {b: [] for b in BANDS[1:]}
+    for uid, (_, score) in sorted(latest.items()):
+        bands[band_of(score)].append(uid)
+    return bands
+
+
+def generate(n, rng, users, mix, actions):
+    """n (band, body) pairs; each column is drawn in one batch from the seeded generator."""
+    band_col = rng.choices(list(mix), weights=list(mix.values()), k=n)
+    action_col = rng.choices(list(actions), weights=list(actions.values()), k=n)
+    amounts = [round(math.exp(rng.gauss(4.2, 0.8)), 2) for _ in range(n)]  # median ~$67, long right tail
+    services = rng.choices(SERVICES, k=n)
+    methods = rng.choices(*PAYMENT_METHODS, k=n)
+    agents = rng.choices(USER_AGENTS, k=n)
+    ips = [f'10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}' for _ in range(n)]
+    lead = [rng.randrange(2, 24 * 21) for _ in range(n)]  # booking lead time in hours
+    ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(2 * n)]
+    providers = users.get('providers') or [None]
+    now = datetime.now(timezone.utc)
+    out = []
+    for i in range(n):
+        band = band_col[i]
+        user_id = str(ids[i]) if band == 'new' else rng.choice(users[band])
+        counterparty = rng.choice(providers)
+        if action_col[i] == 'booking':
+            action = 'booking.create'
+            metadata = {'booking_amount': amounts[i], 'service_type': services[i],
+                        'scheduled_at': (now + timedelta(hours=lead[i])).isoformat(timespec='seconds'),
+                        'location': f'{rng.randrange(1, 9999)} Main St', 'ip_address': ips[i],
+                        'user_agent': agents[i], 'bench': True}
+        else:
+            action = 'payment.initiate'
+            metadata = {'payment_amount': amounts[i], 'currency': 'USD', 'payment_method': methods[i],
+                        'booking_id': str(ids[n + i]), 'description': f'{services[i]} service',
+                        'ip_address': ips[i], 'user_agent': agents[i], 'bench': True}
+        body = {'action_type': action, 'user_id': user_id}
+        if counterparty:
+            body['counterparty_id'] = counterparty
+        body['metadata'] = metadata
+        out.append((band, json.dumps(body, separators=(',', ':'), ensure_ascii=False).encode()))
+    return out
+
+
+def signed_headers(body, secret=HMAC_SECRET):
+    """Service auth as routes/evaluate.ts checks it: HMAC-SHA256 of "<ms timestamp>.<body>"."""
+    ts = str(int(time.time() * 1000))
+    sig = hmac.new(secret.encode(), f'{ts}.'.encode() + body, hashlib.sha256).hexdigest()
+    return {'Content-Type': 'application/json', 'X-HMAC-Signature': sig, 'X-HMAC-Timestamp': ts}
+
+
+def decision_of(status, data):
+    if status != 200:
+        return f'HTTP {status or "error"}'
+    try:
+        result = json.loads(data)
+    except ValueError:
+        return 'HTTP 200 (bad body)'
+    if result.get('risk_tier') == 'unknown':
+        return 'allow (fail-open)'
+    return result.get('decision', '?')
+
+
+def run_step(concurrency, payloads, args, token=None):
+    lock = threading.Lock()
+    by_decision = collections.defaultdict(list)
+    by_band = collections.defaultdict(list)
+    answered = []  # latencies of 200s only, so fast error replies cannot make the SLO look met
+    server_ms = []
+
+    def one(item):
+        band, body = item
+        headers = {'Content-Type': 'application/json', 'Authorization': 'Bearer ' + token} if token \
+            else signed_headers(body)
+        t0 = time.perf_counter()
+        status, _, data = td.POOL.request('POST', EVALUATE, headers, body, args.timeout)
+        elapsed = time.perf_counter() - t0
+        decision = decision_of(status, data)
+        with lock:
+            by_decision[decision].append(elapsed)
+            if status == 200:
+                answered.append(elapsed)
+                by_band[band].append(elapsed)
+                try:
+                    server_ms.append(float(json.loads(data).get('evaluation_time_ms', 0)))
+                except (ValueError, TypeError):
+                    pass
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, payloads))
+    wall = time.perf_counter() - t0
+    return {'concurrency': concurrency, 'wall': wall, 'requests': sum(len(xs) for xs in by_decision.values()),
+            'answered': len(answered), 'latency': summarize(answered),
+            'decisions': {d: summarize(xs) for d, xs in by_decision.items()},
+            'bands': {b: summarize(xs) for b, xs in by_band.items()},
+            'over_slo': sum(1 for x in answered if x * 1000 > args.slo_ms),
+            'server_p95': summarize([x / 1000 for x in server_ms])['p95']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Decision-latency benchmark for POST /api/evaluate')
+    parser.add_argument('--concurrency', default='1,8,32', help='comma-separated worker counts to step through')
+    parser.add_argument('--requests', type=int, default=1000, help='evaluations per step')
+    parser.add_argument('--mix', default='new=0.7,low=0.3', help='user risk mix over new, low, medium, high')
+    parser.add_argument('--actions', default='booking=0.6,payment=0.4', help='booking/payment mix')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the payload generator')
+    parser.add_argument('--slo-ms', type=float, default=200, help='hard latency ceiling (CISClient evaluate timeout)')
+    parser.add_argument('--timeout', type=float, default=None, help='per-request timeout in seconds')
+    parser.add_argument('--jwt', action='store_true', help='authenticate with the admin JWT instead of HMAC')
+    parser.add_argument('--stub', action='store_true', help='benchmark an in-process cis_stub_server')
+    args = parser.parse_args(argv)
+    try:
+        mix = parse_mix(args.mix, BANDS)
+        actions = parse_mix(args.actions, ('booking', 'payment'))
+    except ValueError as e:
+        parser.error(str(e))
+
+    steps = [int(n) for n in args.concurrency.split(',') if n.strip()]
+    td.connect(args.stub, size=max(steps))
+    users = scored_users() if set(mix) - {'new'} else {}
+    for band in [b for b in mix if b != 'new' and not users.get(b)]:
+        print(f'No {band}-risk users on this backend; dropping them from the mix.')
+        del mix[band]
+    if not mix:
+        return 1
+    mix = {k: v / sum(mix.values()) for k, v in mix.items()}
+    code, body = td.curl('GET', '/api/users?user_type=provider&limit=100', td.login())
+    if code == 200:
+        users['providers'] = [u['id'] for u in json.loads(body).get('data', [])]
+    token = td.login() if args.jwt else None
+
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    batches = [generate(args.requests, rng, users, mix, actions) for _ in steps]
+    print('=' * 60)
+    print(f'CIS EVALUATE BENCHMARK -- {args.requests} evaluations per step, SLO {args.slo_ms:g}ms')
+    print(f'  mix {", ".join(f"{k} {v:.0%}" for k, v in mix.items())}; '
+          f'{len(steps) * args.requests} payloads generated in {time.perf_counter() - t0:.2f}s')
+    print('=' * 60)
+    worst, failures = 0, collections.Counter()
+    try:
+        for concurrency, payloads in zip(steps, batches):
+            r = run_step(concurrency, payloads, args, token)
+            lat = r['latency']
+            print(f'\n  concurrency {concurrency}: {r["answered"] / r["wall"]:.0f} evals/s, p50 {lat["p50"]:.1f}ms '
+                  f'p95 {lat["p95"]:.1f}ms p99 {lat["p99"]:.1f}ms max {lat["max"]:.1f}ms '
+                  f'(server-side p95 {r["server_p95"]:.1f}ms), {r["over_slo"]} over SLO')
+            print(f'    {"decision":<20}{"n":>7}{"p50":>9}{"p95":>9}{"p99":>9}{"max":>9}')
+            for name, stats in sorted(r['decisions'].items()) + [(f'[{b}]', s) for b, s in sorted(r['bands'].items())]:
+                print(f'    {name:<20}{stats["n"]:>7}{stats["p50"]:>7.1f}ms{stats["p95"]:>7.1f}ms'
+                      f'{stats["p99"]:>7.1f}ms{stats["max"]:>7.1f}ms')
+            worst = max(worst, r['over_slo'])
+            bad = [d for d in r['decisions'] if d.startswith('HTTP') or d == 'allow (fail-open)']
+            if bad:
+                print(f'    unexpected outcomes: {", ".join(bad)} (HTTP errors left out of latency and SLO)')
+                failures.update({d: r['decisions'][d]['n'] for d in bad})
+    finally:
+        td.POOL.close()
+    print('\n' + '=' * 60)
+    if failures:
+        print('Unexpected outcomes: ' + ', '.join(f'{d} x{n}' for d, n in sorted(failures.items())) + '.')
+    print(f'SLO breached by up to {worst} request(s) per step.' if worst
+          else f'Every answered evaluation under {args.slo_ms:g}ms.')
+    return 1 if worst or failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""End-to-end delivery benchmark for the /api/stream SSE bridge.
+
+For each subscriber count, opens that many concurrent /api/stream connections, injects tagged
+events through POST /api/events and measures emit-to-delivery latency, fan-out throughput and
+dropped or duplicated deliveries. The default event type, relationship.updated, has no backend
+consumers besides the stream, so the benchmark does not trigger detection or enforcement.
+
+    python bench_sse.py --subscribers 1,10,50,100 --events 100 --rate 20
+    python bench_sse.py --stub
+"""
+import argparse, http.client, json, socket, ssl, sys, threading, time, uuid
+from urllib.parse import quote, urlsplit
+
+import test_dashboard as td
+from cis_runner import summarize
+
+
+class Subscriber(threading.Thread):
+    """One SSE connection; records (seq, arrival time) for events tagged with our run id."""
+
+    def __init__(self, base, token, event_type, run_id):
+        super().__init__(daemon=True)
+        u = urlsplit(base)
+        if u.scheme == 'https':
+            self.conn = http.client.HTTPSConnection(u.hostname, u.port or 443, context=ssl.create_default_context())
+        else:
+            self.conn = http.client.HTTPConnection(u.hostname, u.port or 80)
+        self.path = f'/api/stream?token={quote(token)}&events={quote(event_type)}'
+        self.run_id = run_id
+        self.received = []
+        self.connected = threading.Event()
+        self.closing = False
+        self.error = None
+        self.sock = None
+
+    def run(self):
+        try:
+            self.conn.request('GET', self.path, headers={'Accept': 'text/event-stream'})
+            # The response takes ownership of the socket; keep it so close() can unblock readline()
+            self.sock = self.conn.sock
+            resp = self.conn.getresponse()
+            if resp.status != 200:
+                self.error = f'HTTP {resp.status}'
+                return
+            data = []
+            for raw in iter(resp.readline, b''):
+                line = raw.decode('utf-8').rstrip('\r\n')
+                if line.startswith('data:'):
+                    data.append(line[5:].lstrip())
+                elif not line and data:
+                    self.dispatch('\n'.join(data), time.perf_counter())
+                    data = []
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            if not self.closing:
+                self.error = f'{type(e).__name__}: {e}'
+        finally:
+            self.connected.set()
+
+    def dispatch(self, data, at):
+        msg = json.loads(data)
+        if msg.get('type') == 'connected':
+            self.connected.set()
+            return
+        payload = msg.get('payload') or {}
+        if payload.get('bench_run') == self.run_id:
+            self.received.append((payload['seq'], at))
+
+    def close(self):
+        self.closing = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except (AttributeError, OSError):
+            pass
+        self.conn.close()
+
+
+def run_step(count, token, args):
+    run_id = uuid.uuid4().hex
+    subs = [Subscriber(td.BASE, token, args.event_type, run_id) for _ in range(count)]
+    t0 = time.perf_counter()
+    for s in subs:
+        s.start()
+    for s in subs:
+        s.connected.wait(max(0.0, args.connect_timeout - (time.perf_counter() - t0)))
+    connect_time = time.perf_counter() - t0
+    live = [s for s in subs if s.connected.is_set() and not s.error]
+
+    sent, post_errors = {}, 0
+    start = time.perf_counter()
+    for seq in range(args.events):
+        if args.rate:
+            delay = start + seq / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        at = time.perf_counter()
+        code, _ = td.curl('POST', '/api/events', token,
+                          data={'type': args.event_type, 'payload': {'bench_run': run_id, 'seq': seq}})
+        if code == 202:
+            sent[seq] = at
+        else:
+            post_errors += 1
+
+    expected = len(sent) * len(live)
+    deadline = time.perf_counter() + args.drain
+    while sum(len(s.received) for s in live) < expected and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    for s in subs:
+        s.close()
+    for s in subs:
+        s.join(1)
+
+    latencies, dropped, duplicates, last = [], 0, 0, start
+    for s in live:
+        seqs = [seq for seq, _ in s.received]
+        duplicates += len(seqs) - len(set(seqs))
+        dropped += len(set(sent) - set(seqs))
+        for seq, at in s.received:
+            if seq in sent:
+                latencies.append(at - sent[seq])
+                last = max(last, at)
+    delivered = len(latencies)
+    return {
+        'subscribers': count, 'connected': len(live), 'connect_s': connect_time, 'posted': len(sent),
+        'post_errors': post_errors, 'expected': expected, 'delivered': delivered, 'dropped': dropped,
+        'duplicates': duplicates, 'throughput': delivered / (last - start) if last > start else 0.0,
+        'latency': summarize(latencies),
+        'errors': sorted({s.error for s in subs if s.error}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SSE emit-to-delivery benchmark for /api/stream')
+    parser.add_argument('--subscribers', default='1,10,50', help='comma-separated subscriber counts to step through')
+    parser.add_argument('--events', type=int, default=50, help='events injected per step')
+    parser.add_argument('--rate', type=float, default=20, help='events per second (0 = as fast as possible)')
+    parser.add_argument('--event-type', default='relationship.updated', help='event type to inject and subscribe to')
+    parser.add_argument('--connect-timeout', type=float, default=10, help='seconds to wait for all subscribers')
+    parser.add_argument('--drain', type=float, default=5, help='seconds to wait for outstanding deliveries')
+    parser.add_argument('--stub', action='store_true', help='benchmark an in-process cis_stub_server')
+    args = parser.parse_args(argv)
+
+    td.connect(args.stub)
+    token = td.login()
+    if token is None:
+        return 1
+
+    print('=' * 60)
+    print(f'CIS SSE DELIVERY BENCHMARK -- {args.events} events at {args.rate or "max"}/s per step')
+    print('=' * 60)
+    print(f'  {"subs":>6}{"conn":>6}{"conn s":>8}{"delivered":>14}{"drop":>6}{"dup":>5}'
+          f'{"p50":>9}{"p95":>9}{"p99":>9}{"max":>9}{"deliv/s":>10}')
+    bad = False
+    for count in [int(n) for n in args.subscribers.split(',') if n.strip()]:
+        r = run_step(count, token, args)
+        lat = r['latency']
+        delivered = f'{r["delivered"]}/{r["expected"]}'
+        print(f'  {r["subscribers"]:>6}{r["connected"]:>6}{r["connect_s"]:>8.2f}'
+              f'{delivered:>14}{r["dropped"]:>6}{r["duplicates"]:>5}'
+              f'{lat["p50"]:>7.1f}ms{lat["p95"]:>7.1f}ms{lat["p99"]:>7.1f}ms{lat["max"]:>7.1f}ms{r["throughput"]:>10.0f}')
+        for err in r['errors']:
+            print(f'         subscriber error: {err}')
+        if r['post_errors']:
+            print(f'         {r["post_errors"]} POST /api/events failed')
+        bad = bad or r['dropped'] or r['duplicates'] or r['connected'] < count or r['post_errors']
+    print('=' * 60)
+    print('Dropped or duplicated deliveries detected.' if bad else 'Every event delivered exactly once.')
+    return 1 if bad else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""Cold/warm latency benchmark for the stats-v2 analytics endpoints behind the T&S dashboard.
+
+Calls every /api/stats/v2 report across a matrix of the filters it reads (range, granularity,
+entity_type, category). For each combination the first request is timed as cold and `--warm`
+immediate repeats as warm. The server cache counters from /api/ready are read before and after
+each combination: warm calls that get faster without cache hits point at database buffers,
+not the cache/index.ts layer. Results can be saved with --out and compared with --compare.
+
+    python bench_stats.py --warm 5 --out stats-before.json
+    python bench_stats.py --compare stats-before.json
+    python bench_stats.py --stub
+"""
+import argparse, itertools, json, statistics, sys, time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+import test_dashboard as td
+from cis_cache import counters
+from cis_runner import summarize
+
+STATS_V2 = '/api/stats/v2'
+
+# Filters each report reads through parseFilters() in routes/stats-v2.ts
+REPORTS = {
+    'kpi': ('range', 'granularity', 'entity_type', 'category'),
+    'timeline': ('range', 'granularity'),
+    'signal-breakdown': ('range', 'granularity'),
+    'evaluation-stats': ('range', 'granularity'),
+    'alert-stats': ('range',),
+    'booking-timeline': ('range', 'granularity'),
+    'financial-flow': ('range', 'granularity'),
+    'leakage-funnel': ('range',),
+}
+MATRIX = {
+    'range': ['last_24h', 'last_7d', 'last_30d'],
+    'granularity': ['hourly', 'daily', 'weekly'],
+    'entity_type': ['both', 'users', 'providers'],
+    'category': [''],
+}
+
+
+def queries(params, matrix):
+    """Every combination of the matrix values for `params`, as query strings."""
+    axes = [[(p, v) for v in matrix[p]] for p in params]
+    for combo in itertools.product(*axes):
+        yield urlencode([(p, v) for p, v in combo if v])
+
+
+def cache_counters():
+    """(hits, misses) of the backend cache layer from /api/ready, or None if it is not reported."""
+    code, body = td.curl('GET', '/api/ready')
+    if code not in (200, 503):
+        return None
+    try:
+        return counters(json.loads(body))
+    except ValueError:
+        return None
+
+
+def measure(path, token, warm):
+    before = cache_counters()
+    timings, statuses, size = [], set(), 0
+    for _ in range(1 + warm):
+        t0 = time.perf_counter()
+        code, body = td.curl('GET', path, token)
+        timings.append(time.perf_counter() - t0)
+        statuses.add(code)
+        size = len(body)
+    after = cache_counters()
+    hits = misses = None
+    if before and after:
+        hits, misses = after[0] - before[0], after[1] - before[1]
+    return {'cold': round(timings[0] * 1000, 3), 'warm': summarize(timings[1:]), 'status': sorted(statuses),
+            'bytes': size, 'cache_hits': hits, 'cache_misses': misses}
+
+
+def by_report(results):
+    """Median cold and warm p50 per report."""
+    grouped = {}
+    for r in results:
+        grouped.setdefault(r['report'], []).append(r)
+    return {name: {'cold': statistics.median(r['cold'] for r in rows),
+                   'warm': statistics.median(r['warm']['p50'] for r in rows)}
+            for name, rows in grouped.items()}
+
+
+def compare(old, new, out=sys.stdout):
+    before, after = by_report(old['results']), by_report(new['results'])
+    print(f'\nAgainst {old.get("version") or "?"} ({old.get("started_at", "?")}):', file=out)
+    print(f'  {"report":<20}{"cold old":>10}{"cold new":>10}{"Δ":>8}{"warm old":>10}{"warm new":>10}{"Δ":>8}', file=out)
+    pct = lambda a, b: f'{(b - a) / a:+.0%}' if a else 'n/a'
+    for name in REPORTS:
+        if name not in before or name not in after:
+            continue
+        o, n = before[name], after[name]
+        print(f'  {name:<20}{o["cold"]:>8.1f}ms{n["cold"]:>8.1f}ms{pct(o["cold"], n["cold"]):>8}'
+              f'{o["warm"]:>8.1f}ms{n["warm"]:>8.1f}ms{pct(o["warm"], n["warm"]):>8}', file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cold/warm latency benchmark for the stats-v2 endpoints')
+    parser.add_argument('--reports', default=','.join(REPORTS), help='comma-separated reports to benchmark')
+    parser.add_argument('--ranges', default=','.join(MATRIX['range']), help='range values to sweep')
+    parser.add_argument('--granularities', default=','.join(MATRIX['granularity']), help='granularity values to sweep')
+    parser.add_argument('--entity-types', default=','.join(MATRIX['entity_type']), help='entity_type values to sweep')
+    parser.add_argument('--categories', default='', help='service categories to sweep besides "all"')
+    parser.add_argument('--warm', type=int, default=5, help='warm repeats after each cold request')
+    parser.add_argument('--out', metavar='FILE', help='save results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='compare against results saved by an earlier --out')
+    parser.add_argument('--stub', action='store_true', help='benchmark an in-process cis_stub_server')
+    args = parser.parse_args(argv)
+
+    matrix = {'range': args.ranges.split(','), 'granularity': args.granularities.split(','),
+              'entity_type': args.entity_types.split(','),
+              'category': [''] + [c for c in args.categories.split(',') if c]}
+    reports = [r for r in args.reports.split(',') if r]
+    unknown = set(reports) - set(REPORTS)
+    if unknown:
+        parser.error(f'unknown reports: {", ".join(sorted(unknown))}')
+
+    td.connect(args.stub)
+    token = td.login()
+    if token is None:
+        return 1
+    code, body = td.curl('GET', '/api/health')
+    version = json.loads(body).get('version') if code == 200 else None
+    started_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+    print('=' * 60)
+    print(f'CIS STATS-V2 BENCHMARK -- 1 cold + {args.warm} warm per combination')
+    print('=' * 60)
+    print(f'  {"request":<76}{"cold":>9}{"warm p50":>10}{"warm/cold":>10}{"hit/miss":>10}')
+    results, failures = [], 0
+    for name in reports:
+        for qs in queries(REPORTS[name], matrix):
+            path = f'{STATS_V2}/{name}' + (f'?{qs}' if qs else '')
+            r = dict(measure(path, token, args.warm), report=name, query=qs)
+            results.append(r)
+            ratio = r['warm']['p50'] / r['cold'] if r['cold'] else 0.0
+            cache = '-' if r['cache_hits'] is None else f'{r["cache_hits"]}/{r["cache_misses"]}'
+            status = '' if r['status'] == [200] else f'  HTTP {",".join(map(str, r["status"]))}'
+            print(f'  {path:<76.76}{r["cold"]:>7.1f}ms{r["warm"]["p50"]:>8.1f}ms{ratio:>10.2f}{cache:>10}{status}')
+            failures += r['status'] != [200]
+    print('=' * 60)
+    for name, row in by_report(results).items():
+        print(f'  {name:<20} median cold {row["cold"]:>7.1f}ms  warm {row["warm"]:>7.1f}ms')
+    hits = sum(r['cache_hits'] or 0 for r in results)
+    if any(r['cache_hits'] is not None for r in results):
+        print(f'  server cache hits during the run: {hits}' + ('' if hits else ' -- stats-v2 is not served from cache'))
+
+    report = {'base': td.BASE, 'version': version, 'started_at': started_at, 'warm': args.warm, 'results': results}
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
+    td.POOL.close()
+    return 1 if failures or not results else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
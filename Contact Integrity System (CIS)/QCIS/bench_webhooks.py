@@ -0,0 +1,246 @@
+"""Throughput and idempotency storm benchmark for POST /api/webhooks/ingest.
+
+Signs webhook envelopes locally with the shared HMAC secret and drives sustained ingest traffic
+at each concurrency step. A configurable share of requests re-sends an earlier event unchanged,
+as the marketplace does when it retries, and periodic bursts fire the same new event_id from
+many connections at once. Every response is tallied per event_id, so the report shows
+accepted/duplicate counts, latency percentiles, where throughput stops scaling, and any event
+the backend processed more than once. The default event type, category-update, has no backend
+consumers, so the benchmark does not trigger detection or enforcement.
+
+    python bench_webhooks.py --concurrency 1,4,16,64 --duration 10 --dup-ratio 0.2
+    python bench_webhooks.py --stub
+"""
+import argparse, collections, hashlib, hmac, json, os, random, sys, threading, time, uuid
+from datetime import datetime, timezone
+
+import test_dashboard as td
+from cis_runner import summarize
+
+WEBHOOK_SECRET = os.environ.get('CIS_WEBHOOK_SECRET', 'dev_webhook_secret_change_in_production')
+INGEST = '/api/webhooks/ingest'
+
+
+def sign(body, secret=WEBHOOK_SECRET):
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def envelope(event_type, payload):
+    """Returns (event_id, body) for a fresh event.
+
+    The backend signs JSON.stringify(req.body), so the body is compact and keeps the
+    webhookIngestSchema key order; the HMAC then matches byte for byte.
+    """
+    event_id = f'bench-{uuid.uuid4().hex}'
+    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    doc = {'event_id': event_id, 'event_type': event_type, 'timestamp': timestamp, 'source': 'qwickservices',
+           'payload': payload}
+    return event_id, json.dumps(doc, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def post(event_id, body, timeout=None):
+    headers = {'Content-Type': 'application/json', 'X-Webhook-Signature': sign(body)}
+    t0 = time.perf_counter()
+    status, _, data = td.POOL.request('POST', INGEST, headers, body, timeout)
+    return status, data, time.perf_counter() - t0
+
+
+def outcome(status, data):
+    if status == 202:
+        return 'accepted'
+    if status == 200:
+        try:
+            if json.loads(data).get('duplicate'):
+                return 'duplicate'
+        except ValueError:
+            pass
+        return 'error'
+    return {0: 'transport', 401: 'rejected', 429: 'throttled'}.get(status, 'error')
+
+
+def webhook_id(data):
+    try:
+        return json.loads(data).get('event_id')
+    except ValueError:
+        return None
+
+
+class Ledger:
+    """Thread-safe tally of every response, by outcome and by event_id."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.outcomes = collections.Counter()
+        self.latencies = []
+        self.accepted = collections.defaultdict(list)  # event_id -> webhook ids from 202s
+        self.echoed = collections.defaultdict(set)  # event_id -> webhook ids from duplicate 200s
+        self.sent = set()
+        self.statuses = collections.Counter()
+
+    def record(self, event_id, status, data, elapsed):
+        kind = outcome(status, data)
+        with self.lock:
+            self.sent.add(event_id)
+            self.outcomes[kind] += 1
+            self.latencies.append(elapsed)
+            if kind == 'accepted':
+                self.accepted[event_id].append(webhook_id(data))
+            elif kind == 'duplicate':
+                self.echoed[event_id].add(webhook_id(data))
+            elif kind in ('error', 'transport'):
+                self.statuses[status] += 1
+
+    def double_processed(self, ids=None):
+        """Event ids accepted more than once, or whose duplicate replies name a different record."""
+        bad = set()
+        for event_id in self.sent if ids is None else ids:
+            accepted = self.accepted.get(event_id, [])
+            if len(accepted) > 1 or (accepted and self.echoed.get(event_id, set()) - {accepted[0]}):
+                bad.add(event_id)
+        return bad
+
+    def unacked(self, ids=None):
+        return {e for e in (self.sent if ids is None else ids) if e not in self.accepted and e not in self.echoed}
+
+
+def sustain(ledger, stop, rng, recent, args):
+    """One closed-loop worker: new events, or with probability dup_ratio an unchanged retry of a recent one."""
+    while not stop.is_set():
+        with recent['lock']:
+            retry = recent['events'] and rng.random() < args.dup_ratio
+            if retry:
+                event_id, body = rng.choice(recent['events'])
+        if not retry:
+            event_id, body = envelope(args.event_type, {'id': rng.randrange(1 << 30), 'name': 'bench'})
+            with recent['lock']:
+                recent['events'].append((event_id, body))
+                del recent['events'][:-args.dup_window]
+        status, data, elapsed = post(event_id, body, args.timeout)
+        ledger.record(event_id, status, data, elapsed)
+
+
+def burst(ledger, size, args):
+    """Fires `size` identical posts of one new event_id as close to simultaneously as possible."""
+    event_id, body = envelope(args.event_type, {'id': 0, 'name': 'bench-burst'})
+    gate = threading.Barrier(size)
+
+    def fire():
+        try:
+            gate.wait(5)
+        except threading.BrokenBarrierError:
+            pass
+        status, data, elapsed = post(event_id, body, args.timeout)
+        ledger.record(event_id, status, data, elapsed)
+
+    threads = [threading.Thread(target=fire, daemon=True) for _ in range(size)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return event_id
+
+
+def run_step(concurrency, args):
+    ledger, stop = Ledger(), threading.Event()
+    recent = {'lock': threading.Lock(), 'events': []}
+    workers = [threading.Thread(target=sustain, args=(ledger, stop, random.Random(args.seed + i), recent, args),
+                                daemon=True) for i in range(concurrency)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    bursts = []
+    while True:
+        remaining = start + args.duration - time.perf_counter()
+        if remaining <= 0:
+            break
+        if args.burst_size > 1 and args.burst_interval:
+            time.sleep(min(remaining, args.burst_interval))
+            if time.perf_counter() < start + args.duration:
+                bursts.append(burst(ledger, args.burst_size, args))
+        else:
+            time.sleep(remaining)
+    stop.set()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - start
+
+    burst_accepts = collections.Counter(min(len(ledger.accepted.get(e, [])), 2) for e in bursts)
+    return {
+        'concurrency': concurrency, 'wall': wall, 'requests': len(ledger.latencies),
+        'outcomes': ledger.outcomes, 'events': len(ledger.sent), 'latency': summarize(ledger.latencies),
+        'double': len(ledger.double_processed()), 'unacked': len(ledger.unacked()),
+        'bursts': len(bursts), 'burst_once': burst_accepts[1], 'burst_none': burst_accepts[0],
+        'burst_double': burst_accepts[2], 'statuses': ledger.statuses,
+    }
+
+
+def saturation(rows, gain=1.1):
+    """The first step whose throughput grew less than `gain` times over the previous one, or None."""
+    for prev, row in zip(rows, rows[1:]):
+        if row['requests'] / row['wall'] < gain * prev['requests'] / prev['wall']:
+            return prev
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Webhook ingest throughput and idempotency storm benchmark')
+    parser.add_argument('--concurrency', default='1,4,16', help='comma-separated worker counts to step through')
+    parser.add_argument('--duration', type=float, default=5, help='seconds of sustained traffic per step')
+    parser.add_argument('--dup-ratio', type=float, default=0.2, help='share of requests that retry a recent event')
+    parser.add_argument('--dup-window', type=int, default=1000, help='how many recent events retries pick from')
+    parser.add_argument('--burst-size', type=int, default=8, help='concurrent posts of one event_id per burst (0 = off)')
+    parser.add_argument('--burst-interval', type=float, default=1, help='seconds between bursts')
+    parser.add_argument('--event-type', default='category-update', help='Laravel event type to send')
+    parser.add_argument('--timeout', type=float, default=None, help='per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the retry choices')
+    parser.add_argument('--stub', action='store_true', help='benchmark an in-process cis_stub_server')
+    args = parser.parse_args(argv)
+
+    steps = [int(n) for n in args.concurrency.split(',') if n.strip()]
+    td.connect(args.stub, size=max(steps) + max(args.burst_size, 0))
+
+    print('=' * 60)
+    print(f'CIS WEBHOOK INGEST BENCHMARK -- {args.duration:g}s per step, {args.dup_ratio:.0%} retries, '
+          f'bursts of {args.burst_size} every {args.burst_interval:g}s')
+    print('=' * 60)
+    print(f'  {"conc":>5}{"req/s":>8}{"new/s":>8}{"accept":>8}{"dup":>7}{"429":>6}{"err":>6}'
+          f'{"p50":>9}{"p95":>9}{"p99":>9}{"max":>9}{"double":>8}')
+    rows, double, rejected = [], False, 0
+    try:
+        for concurrency in steps:
+            r = run_step(concurrency, args)
+            rows.append(r)
+            o, lat = r['outcomes'], r['latency']
+            print(f'  {concurrency:>5}{r["requests"] / r["wall"]:>8.0f}{o["accepted"] / r["wall"]:>8.0f}'
+                  f'{o["accepted"]:>8}{o["duplicate"]:>7}{o["throttled"]:>6}'
+                  f'{o["error"] + o["transport"] + o["rejected"]:>6}'
+                  f'{lat["p50"]:>7.1f}ms{lat["p95"]:>7.1f}ms{lat["p99"]:>7.1f}ms{lat["max"]:>7.1f}ms{r["double"]:>8}')
+            if r['bursts']:
+                print(f'         bursts: {r["bursts"]} fired, {r["burst_once"]} accepted once, '
+                      f'{r["burst_none"]} never accepted, {r["burst_double"]} accepted more than once')
+            if o['rejected']:
+                print(f'         {o["rejected"]} rejected with 401 -- check CIS_WEBHOOK_SECRET')
+            if r['statuses']:
+                print('         errors by status: ' + ', '.join(f'{s or "no response"} x{n}'
+                                                         for s, n in sorted(r['statuses'].items())))
+            if r['unacked']:
+                print(f'         {r["unacked"]} of {r["events"]} events never acknowledged')
+            double = double or r['double'] or r['burst_double']
+            rejected += o['rejected']
+    finally:
+        td.POOL.close()
+    print('=' * 60)
+    knee = saturation(rows)
+    if knee:
+        print(f'Throughput stops scaling past {knee["concurrency"]} concurrent '
+              f'({knee["requests"] / knee["wall"]:.0f} req/s).')
+    elif len(rows) > 1:
+        print('Throughput still scaling at the highest concurrency tried.')
+    print('Events processed more than once.' if double else 'Every event processed at most once.')
+    if rejected:
+        print(f'Signature rejected on {rejected} request(s) (HTTP 401); check CIS_WEBHOOK_SECRET.')
+    return 1 if double or rejected else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""On-disk JWT cache so harness runs and their workers reuse one admin login.
+
+Tokens are stored per (base URL, account) with their decoded `exp`. A cached token is handed
+out until it is within REFRESH_AHEAD seconds of expiring; only then, or after invalidate(), is
+the login callback called again. One login is in flight at a time per process, and per cache
+file where fcntl is available, so concurrent workers wait for the same token instead of
+each paying the server-side password hash.
+"""
+import base64, json, os, tempfile, threading, time
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+TOKEN_CACHE = os.environ.get('CIS_TOKEN_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'cis', 'tokens.json'))
+REFRESH_AHEAD = float(os.environ.get('CIS_TOKEN_REFRESH', '300'))
+
+
+def jwt_expiry(token):
+    """The `exp` claim of a JWT (unverified), or None if it has none or is not a JWT."""
+    try:
+        payload = token.split('.')[1]
+        exp = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))).get('exp')
+    except (IndexError, ValueError, AttributeError):
+        return None
+    return exp if isinstance(exp, (int, float)) else None
+
+
+class TokenCache:
+    """get() returns a live token for (base, account), logging in through `login()` only when needed.
+
+    With `path=None` tokens are kept in memory only, which still shares them between threads.
+    """
+
+    def __init__(self, path=TOKEN_CACHE, refresh_ahead=REFRESH_AHEAD):
+        self.path = path
+        self.refresh_ahead = refresh_ahead
+        self.lock = threading.Lock()
+        self.tokens = {}
+
+    @staticmethod
+    def key(base, account):
+        return f'{base.rstrip("/")}|{account}'
+
+    def fresh(self, entry, now=None):
+        return entry is not None and entry['exp'] - (now or time.time()) > self.refresh_ahead
+
+    def get(self, base, account, login):
+        """`login()` returns a new token or None; None is passed through and nothing is cached."""
+        key = self.key(base, account)
+        entry = self.tokens.get(key)
+        if self.fresh(entry):
+            return entry['token']
+        with self.lock, self._file_lock():
+            entry = self.tokens.get(key) or self._read().get(key)
+            if self.fresh(entry):
+                self.tokens[key] = entry
+                return entry['token']
+            token = login()
+            if token is None:
+                return None
+            self._store(key, token)
+            return token
+
+    def put(self, base, account, token):
+        """Caches a token obtained elsewhere, e.g. by a check that logs in on purpose."""
+        with self.lock, self._file_lock():
+            self._store(self.key(base, account), token)
+
+    def invalidate(self, base, account):
+        """Drops the token, e.g. after a 401, so the next get() logs in again."""
+        key = self.key(base, account)
+        with self.lock, self._file_lock():
+            self.tokens.pop(key, None)
+            entries = self._read()
+            if entries.pop(key, None) is not None:
+                self._write(entries)
+
+    def _store(self, key, token):
+        # Tokens without an exp claim are used for this process only
+        exp = jwt_expiry(token)
+        if exp is None:
+            return
+        entry = {'token': token, 'exp': exp}
+        self.tokens[key] = entry
+        now = time.time()
+        entries = {k: e for k, e in self._read().items() if e.get('exp', 0) > now}
+        entries[key] = entry
+        self._write(entries)
+
+    def _read(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, entries):
+        if not self.path:
+            return
+        folder = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(folder, mode=0o700, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=folder, prefix='.tokens-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # An unwritable cache only costs a login next run
+
+    def _file_lock(self):
+        return _FileLock(self.path + '.lock' if self.path and fcntl else None)
+
+
+class _FileLock:
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), mode=0o700, exist_ok=True)
+                self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            except OSError:
+                self.fd = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
@@ -0,0 +1,98 @@
+"""Cache-effectiveness and invalidation probe of read endpoints.
+
+cache/index.ts counts every lookup in process-wide hit and miss counters, which /api/ready
+reports as "hits=H misses=M size=S". The probe reads the counters before and after each
+request, so each request is classified by what the server did: a hit, a miss, or no cache
+lookup at all. Requests are made one at a time. Other traffic on the backend can still move
+the counters, so a request that moved them by more than one lookup is counted as ambiguous.
+
+Staleness is measured separately. The probe reads an entity so that any cache holds it,
+mutates the entity, then polls the read until the change shows.
+"""
+import re, statistics, time
+
+CACHE_DETAIL = re.compile(r'hits=(\d+) misses=(\d+)')
+
+
+def counters(ready):
+    """(hits, misses) from a /api/ready body's cache check, or None when it has none."""
+    try:
+        m = CACHE_DETAIL.search(ready['checks']['cache']['detail'])
+    except (KeyError, TypeError):
+        return None
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def classify(before, after):
+    if before is None or after is None:
+        return 'unknown'
+    hits, misses = after[0] - before[0], after[1] - before[1]
+    if hits == misses == 0:
+        return 'uncached'
+    if hits + misses > 1:
+        return 'ambiguous'
+    return 'hit' if hits else 'miss'
+
+
+def probe(fetch, read_counters, repeats):
+    """Makes `repeats` identical requests; fetch() returns an HTTP status, read_counters() (hits, misses).
+
+    Returns {'status': last status, 'samples': [(kind, seconds)]}.
+    """
+    samples, status = [], None
+    for _ in range(repeats):
+        before = read_counters()
+        t0 = time.perf_counter()
+        status = fetch()
+        elapsed = time.perf_counter() - t0
+        samples.append((classify(before, read_counters()), elapsed))
+    return {'status': status, 'samples': samples}
+
+
+def summary(result):
+    """Hit ratio, miss/hit p50 in ms and speedup for one probe.
+
+    When the server never counted a lookup, the split falls back to latency alone: the first
+    (cold) request against the median of the rest.
+    """
+    samples = result['samples']
+    kinds = [k for k, _ in samples]
+    hits = [t for k, t in samples if k == 'hit']
+    misses = [t for k, t in samples if k == 'miss']
+    out = {'requests': len(samples), 'hits': len(hits), 'misses': len(misses),
+           'uncached': kinds.count('uncached'), 'ambiguous': kinds.count('ambiguous') + kinds.count('unknown')}
+    out['hit_ratio'] = len(hits) / (len(hits) + len(misses)) if hits or misses else None
+    if hits and misses:
+        out['miss_ms'], out['hit_ms'] = statistics.median(misses) * 1000, statistics.median(hits) * 1000
+        out['basis'] = 'server counters'
+    elif len(samples) > 1:
+        out['miss_ms'] = samples[0][1] * 1000
+        out['hit_ms'] = statistics.median(t for _, t in samples[1:]) * 1000
+        out['basis'] = 'cold vs warm latency'
+    else:
+        out['miss_ms'] = out['hit_ms'] = None
+        out['basis'] = None
+    out['speedup'] = out['miss_ms'] / out['hit_ms'] if out['hit_ms'] else None
+    return out
+
+
+def staleness(read, mutate, visible, timeout=10.0, poll=0.05):
+    """Seconds from a successful mutate() until visible(read()) holds, and the stale reads before it.
+
+    read() returns whatever visible() inspects; mutate() returns True on success. The read is
+    made once before mutating so that a cache, if the route has one, holds the old version.
+    Returns (seconds or None if it never showed within `timeout`, stale reads), or None if
+    the mutation failed.
+    """
+    read()
+    if not mutate():
+        return None
+    t0 = time.perf_counter()
+    stale = 0
+    while True:
+        if visible(read()):
+            return time.perf_counter() - t0, stale
+        stale += 1
+        if time.perf_counter() - t0 >= timeout:
+            return None, stale
+        time.sleep(poll)
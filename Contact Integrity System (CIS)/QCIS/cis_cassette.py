@@ -0,0 +1,154 @@
+"""Record/replay of harness HTTP traffic to gzip'd JSON-lines cassettes.
+
+    python test_dashboard.py --record run.cassette
+    python test_dashboard.py --replay run.cassette [--replay-latency]
+    python cis_cassette.py diff old.cassette new.cassette
+"""
+import argparse, base64, collections, gzip, hashlib, json, sys, threading, time
+from datetime import datetime, timezone
+
+from cis_client import TRACE
+
+VERSION = 1
+
+
+def body_key(body):
+    return hashlib.sha256(body or b'').hexdigest()[:16]
+
+
+def encode_body(data):
+    try:
+        return {'text': data.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'b64': base64.b64encode(data).decode()}
+
+
+def decode_body(entry):
+    return entry['text'].encode('utf-8') if 'text' in entry else base64.b64decode(entry['b64'])
+
+
+def load(path):
+    """Returns (header, entries) from a cassette file."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get('cassette') != VERSION:
+        raise ValueError(f'{path} is not a version {VERSION} cassette')
+    return lines[0], lines[1:]
+
+
+class RecordingTransport:
+    """Wraps a Pool, passing requests through and keeping every exchange for save()."""
+
+    def __init__(self, pool, base):
+        self.pool = pool
+        self.base = base
+        self.entries = []
+        self.lock = threading.Lock()
+
+    def request(self, method, path, headers=None, body=None, timeout=None):
+        trace = []
+        token = TRACE.set(trace)
+        try:
+            status, resp_headers, data = self.pool.request(method, path, headers, body, timeout)
+        finally:
+            TRACE.reset(token)
+        outer = TRACE.get()
+        if outer is not None:
+            outer.extend(trace)
+        entry = {'method': method, 'path': path, 'request': body_key(body), 'status': status,
+                 'headers': resp_headers, 'body': encode_body(data), 'timing': trace[-1] if trace else None}
+        with self.lock:
+            entry['seq'] = len(self.entries)
+            self.entries.append(entry)
+        return status, resp_headers, data
+
+    def save(self, path):
+        header = {'cassette': VERSION, 'base': self.base,
+                  'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for row in [header] + self.entries:
+                f.write(json.dumps(row, separators=(',', ':')) + '\n')
+
+    def set_deadline(self, seconds):
+        self.pool.set_deadline(seconds)
+
+    def close(self):
+        self.pool.close()
+
+
+class ReplayTransport:
+    """Serves recorded responses keyed by (method, path, request body).
+
+    Repeated identical requests are answered in recorded order; once a key's recordings are
+    used up its last response is served again. With `latency` the recorded total time is
+    slept before answering, otherwise replay runs at full speed.
+    """
+
+    def __init__(self, path, latency=False):
+        self.header, entries = load(path)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.queues = collections.defaultdict(collections.deque)
+        self.last = {}
+        for e in entries:
+            self.queues[(e['method'], e['path'], e['request'])].append(e)
+
+    def request(self, method, path, headers=None, body=None, timeout=None):
+        key = (method, path, body_key(body))
+        with self.lock:
+            queue = self.queues.get(key)
+            entry = queue.popleft() if queue else self.last.get(key)
+            if entry is not None:
+                self.last[key] = entry
+        if entry is None:
+            return 0, {}, b''
+        timing = entry['timing']
+        if timing and self.latency:
+            time.sleep(timing['total'] / 1000)
+        trace = TRACE.get()
+        if trace is not None and timing:
+            trace.append(dict(timing, replayed=True))
+        return entry['status'], dict(entry['headers']), decode_body(entry['body'])
+
+    def set_deadline(self, seconds):
+        """Replay never waits on a server; recorded timeouts come back as recorded."""
+
+    def close(self):
+        pass
+
+
+def diff(old_path, new_path, out=sys.stdout):
+    """Per request: status, payload size and total time of two cassettes side by side."""
+    summary = {}
+    for label, path in (('old', old_path), ('new', new_path)):
+        _, entries = load(path)
+        for e in entries:
+            row = summary.setdefault((e['method'], e['path']), {})
+            size = len(decode_body(e['body']))
+            total = e['timing']['total'] if e['timing'] else 0.0
+            row.setdefault(label, []).append((e['status'], size, total))
+    print(f'  {"request":<44}{"status":>10}{"bytes old":>11}{"bytes new":>11}{"Δbytes":>9}'
+          f'{"ms old":>9}{"ms new":>9}{"Δms":>9}', file=out)
+    for (method, path), row in sorted(summary.items(), key=lambda kv: kv[0][1]):
+        old, new = row.get('old', []), row.get('new', [])
+        avg = lambda xs, i: sum(x[i] for x in xs) / len(xs) if xs else 0.0
+        statuses = f'{old[0][0] if old else "-"}/{new[0][0] if new else "-"}'
+        bo, bn, to, tn = avg(old, 1), avg(new, 1), avg(old, 2), avg(new, 2)
+        print(f'  {method + " " + path:<44.44}{statuses:>10}{bo:>11.0f}{bn:>11.0f}{bn - bo:>+9.0f}'
+              f'{to:>9.1f}{tn:>9.1f}{tn - to:>+9.1f}', file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect harness cassettes')
+    sub = parser.add_subparsers(dest='command', required=True)
+    d = sub.add_parser('diff', help='compare payload sizes and timings of two cassettes')
+    d.add_argument('old')
+    d.add_argument('new')
+    args = parser.parse_args(argv)
+    if args.command == 'diff':
+        diff(args.old, args.new)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""Pooled keep-alive HTTP transport for the CIS dashboard harness (stdlib only)."""
+import contextvars, http.client, os, queue, socket, ssl, threading, time
+from urllib.parse import urlsplit
+
+POOL_SIZE = int(os.environ.get('CIS_POOL_SIZE', '8'))
+REQUEST_TIMEOUT = float(os.environ.get('CIS_TIMEOUT', '30'))
+
+# timing_record errors that mean the request ran out of time rather than failed
+TIMEOUTS = ('timeout', 'deadline')
+
+# Errors that mean a reused keep-alive socket was closed by the server between requests
+STALE = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+# Methods safe to re-send when a reused keep-alive socket turns out to be dead (RFC 9110 9.2.2)
+IDEMPOTENT = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# List that every request made in the current context appends its timing record to, if set
+TRACE = contextvars.ContextVar('cis_trace', default=None)
+
+
+class Connection(http.client.HTTPConnection):
+    def __init__(self, pool):
+        super().__init__(pool.host, pool.port, timeout=pool.timeout)
+        self.pool = pool
+        self.phases = {}
+
+    def connect(self):
+        t0 = time.perf_counter()
+        addrs = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)
+        t1 = time.perf_counter()
+        sock, err = None, None
+        for family, kind, proto, _, addr in addrs:
+            try:
+                sock = socket.socket(family, kind, proto)
+                sock.settimeout(self.timeout)
+                sock.connect(addr)
+                break
+            except OSError as e:
+                err = e
+                sock.close()
+                sock = None
+        if sock is None:
+            raise err or OSError(f'no addresses for {self.host}')
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        t2 = time.perf_counter()
+        if self.pool.tls:
+            # Resume the last TLS session so new pool members skip the full handshake
+            sock = self.pool.context.wrap_socket(sock, server_hostname=self.host, session=self.pool.tls_session)
+        t3 = time.perf_counter()
+        self.sock = sock
+        self.phases = {'dns': t1 - t0, 'connect': t2 - t1, 'tls': t3 - t2}
+
+
+def timing_record(method, path, status, phases, ttfb, total, reused, size, error=None):
+    """Request timing in milliseconds; ttfb and total are measured from the start of the request.
+
+    `error` is None for a response, else 'timeout' (socket timeout), 'deadline' (cut off by or
+    refused after the pool's deadline) or 'transport'.
+    """
+    ms = lambda x: round(x * 1000, 3)
+    return {
+        'method': method, 'path': path, 'status': status, 'reused': reused, 'bytes': size, 'error': error,
+        'dns': ms(phases.get('dns', 0)), 'connect': ms(phases.get('connect', 0)),
+        'tls': ms(phases.get('tls', 0)), 'ttfb': ms(ttfb), 'total': ms(total),
+    }
+
+
+class Pool:
+    """Keeps up to `size` persistent connections to one origin and hands them out per request."""
+
+    def __init__(self, base, size=POOL_SIZE, timeout=REQUEST_TIMEOUT):
+        u = urlsplit(base)
+        self.tls = u.scheme == 'https'
+        self.host = u.hostname
+        self.port = u.port or (443 if self.tls else 80)
+        self.timeout = timeout
+        self.context = ssl.create_default_context() if self.tls else None
+        self.tls_session = None
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.headers = {'Host': u.netloc, 'User-Agent': 'cis-dashboard-test', 'Accept': '*/*'}
+        self.deadline = None
+        self.timer = None
+        self.active = set()
+        self.active_lock = threading.Lock()
+
+    def set_deadline(self, seconds):
+        """From `seconds` from now, refuses new requests and cuts off those in flight; None clears it."""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.deadline = None if seconds is None else time.perf_counter() + seconds
+        if seconds is not None:
+            self.timer = threading.Timer(max(0.0, seconds), self.cancel)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def cancel(self):
+        """Shuts down the sockets of requests in flight, which then return status 0."""
+        with self.active_lock:
+            conns = list(self.active)
+        for conn in conns:
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except (OSError, AttributeError):
+                pass
+
+    def request(self, method, path, headers=None, body=None, timeout=None):
+        """Returns (status, headers, body bytes); status 0 means the request never got a response.
+
+        `timeout` overrides the pool's socket timeout for this request only; a deadline set with
+        set_deadline() shortens it to the time left. When TRACE is set, a timing_record for the
+        request is appended to it.
+        """
+        hdrs = dict(self.headers, **(headers or {}))
+        with self.slots:
+            conn = self._take()
+            timeout = self.timeout if timeout is None else timeout
+            if self.deadline is not None:
+                left = self.deadline - time.perf_counter()
+                if left <= 0:
+                    self.idle.put(conn)
+                    self._trace(method, path, 0, {}, 0.0, 0.0, False, 0, 'deadline')
+                    return 0, {}, b''
+                timeout = left if timeout is None else min(timeout, left)
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(conn.timeout)
+            reused = conn.sock is not None
+            conn.phases = {}
+            t0 = time.perf_counter()
+            ttfb = 0.0
+            with self.active_lock:
+                self.active.add(conn)
+            try:
+                try:
+                    resp = self._send(conn, method, path, hdrs, body)
+                except STALE:
+                    # A socket cut off by cancel() looks stale too; do not retry past the deadline.
+                    # The server may already have applied a write, so only idempotent methods are re-sent.
+                    if not reused or method not in IDEMPOTENT or \
+                            (self.deadline is not None and time.perf_counter() >= self.deadline):
+                        raise
+                    conn.close()
+                    reused = False
+                    resp = self._send(conn, method, path, hdrs, body)
+                ttfb = time.perf_counter() - t0
+                data = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                self.idle.put(conn)
+                if self.deadline is not None and time.perf_counter() >= self.deadline:
+                    error = 'deadline'
+                else:
+                    error = 'timeout' if isinstance(e, TimeoutError) else 'transport'
+                self._trace(method, path, 0, conn.phases, ttfb, time.perf_counter() - t0, reused, 0, error)
+                return 0, {}, b''
+            finally:
+                with self.active_lock:
+                    self.active.discard(conn)
+            total = time.perf_counter() - t0
+            if self.tls and conn.sock is not None:
+                self.tls_session = conn.sock.session
+            if resp.will_close:
+                conn.close()
+            self.idle.put(conn)
+            self._trace(method, path, resp.status, conn.phases, ttfb, total, reused, len(data))
+            return resp.status, {k.lower(): v for k, v in resp.getheaders()}, data
+
+    def pipeline(self, requests, timeout=None):
+        """Writes `requests` [(method, path, headers, body)] back to back on one connection, then
+        reads the responses in order (HTTP/1.1 pipelining).
+
+        Returns a (status, headers, body bytes) per request. Requests the server never answered,
+        because it closed the connection part-way, get status 0 and can be sent again. A reused
+        socket that turns out to be closed is retried once on a fresh one, as request() does.
+        """
+        with self.slots:
+            conn = self._take()
+            timeout = self.timeout if timeout is None else timeout
+            if self.deadline is not None:
+                left = self.deadline - time.perf_counter()
+                if left <= 0:
+                    self.idle.put(conn)
+                    for method, path, *_ in requests:
+                        self._trace(method, path, 0, {}, 0.0, 0.0, False, 0, 'deadline')
+                    return [(0, {}, b'')] * len(requests)
+                timeout = left if timeout is None else min(timeout, left)
+            conn.timeout = timeout
+            reused = conn.sock is not None
+            wire = b''.join(self._encode(*r) for r in requests)
+            with self.active_lock:
+                self.active.add(conn)
+            try:
+                out = self._exchange(conn, requests, wire, reused)
+                if out is None:
+                    out = self._exchange(conn, requests, wire, False)
+            finally:
+                with self.active_lock:
+                    self.active.discard(conn)
+            self.idle.put(conn)
+        return out + [(0, {}, b'')] * (len(requests) - len(out))
+
+    def _encode(self, method, path, headers=None, body=None):
+        hdrs = dict(self.headers, **(headers or {}))
+        if body is not None:
+            hdrs['Content-Length'] = str(len(body))
+        head = f'{method} {path} HTTP/1.1\r\n' + ''.join(f'{k}: {v}\r\n' for k, v in hdrs.items()) + '\r\n'
+        return head.encode('latin-1') + (body or b'')
+
+    def _exchange(self, conn, requests, wire, reused):
+        """Responses read for one pipelined write, stopping at the first the server closes after.
+
+        Returns None, with the connection closed, when a reused socket was stale before any response.
+        """
+        out = []
+        t0 = time.perf_counter()
+        conn.phases = {}
+        try:
+            if conn.sock is None:
+                conn.connect()
+            else:
+                conn.sock.settimeout(conn.timeout)
+            conn.sock.sendall(wire)
+            reader = _Shared(conn.sock.makefile('rb'))
+            for method, path, *_ in requests:
+                resp = http.client.HTTPResponse(reader, method=method)
+                resp.begin()
+                ttfb = time.perf_counter() - t0
+                data = resp.read()
+                self._trace(method, path, resp.status, conn.phases, ttfb, time.perf_counter() - t0, reused, len(data))
+                out.append((resp.status, {k.lower(): v for k, v in resp.getheaders()}, data))
+                conn.phases = {}
+                if resp.will_close:
+                    break
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            if reused and not out and isinstance(e, STALE) and \
+                    (self.deadline is None or time.perf_counter() < self.deadline):
+                return None
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                error = 'deadline'
+            else:
+                error = 'timeout' if isinstance(e, TimeoutError) else 'transport'
+            for method, path, *_ in requests[len(out):]:
+                self._trace(method, path, 0, {}, 0.0, time.perf_counter() - t0, reused, 0, error)
+            return out
+        if len(out) < len(requests) or out and out[-1][1].get('connection', '').lower() == 'close':
+            conn.close()
+        elif self.tls and conn.sock is not None:
+            self.tls_session = conn.sock.session
+        return out
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _take(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return Connection(self)
+
+    def _send(self, conn, method, path, headers, body):
+        conn.request(method, path, body=body, headers=headers)
+        return conn.getresponse()
+
+    def _trace(self, method, path, status, phases, ttfb, total, reused, size, error=None):
+        trace = TRACE.get()
+        if trace is not None:
+            trace.append(timing_record(method, path, status, phases, ttfb, total, reused, size, error))
+
+
+class _Shared:
+    """A pipelined connection's one buffered reader, lent to each HTTPResponse in turn.
+
+    HTTPResponse makes its own buffered file from the socket and closes it after the body,
+    which would lose whatever of the next response had already been read ahead.
+    """
+
+    def __init__(self, fp):
+        self.fp = fp
+
+    def makefile(self, mode):
+        return self
+
+    def close(self):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.fp, name)
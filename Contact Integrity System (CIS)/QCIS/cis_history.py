@@ -0,0 +1,229 @@
+"""SQLite history of harness runs, and a per-endpoint latency regression check between runs.
+
+Every check run of test_dashboard.py is appended with its deploy version, check outcomes and
+per-request timings. `compare` pools the request latencies of two selections of runs per route
+and flags routes whose latency distribution moved up significantly (one-sided Mann-Whitney U).
+A single run makes only one to three requests per route, too few to test, so compare windows
+of runs rather than one run against the next. Only runs of one --mode are compared (check by
+default), so page-1-only --daemon probes never mix with full check runs.
+
+    python cis_history.py runs
+    python cis_history.py compare version=2.0.0 version=2.1.0
+    python cis_history.py compare 2026-10-01..2026-10-08 since=2026-10-13
+    python cis_history.py compare last-19..last-10 last-9..last
+"""
+import argparse, math, os, sqlite3, statistics, sys
+
+from cis_runner import route_of
+
+HISTORY_DB = os.environ.get('CIS_HISTORY', os.path.join(os.path.expanduser('~'), '.cache', 'cis', 'history.db'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    base TEXT NOT NULL,
+    version TEXT,
+    mode TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    duration_ms REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS checks (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    section INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    detail TEXT
+);
+CREATE TABLE IF NOT EXISTS requests (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    method TEXT NOT NULL,
+    route TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    ttfb_ms REAL NOT NULL,
+    total_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_started ON runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_requests_run ON requests(run_id);
+"""
+
+
+def open_db(path=HISTORY_DB):
+    if path != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def record(db, report, version=None, mode='check'):
+    """Appends a cis_report.build_report() dict, with every request of each section's trace; returns the run id."""
+    with db:
+        run_id = db.execute(
+            'INSERT INTO runs (started_at, base, version, mode, passed, failed, duration_ms) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (report['started_at'], report['base'], version, mode, report['passed'], report['failed'],
+             report['duration'])).lastrowid
+        for s in report['sections']:
+            db.executemany('INSERT INTO checks VALUES (?, ?, ?, ?, ?)',
+                           [(run_id, s['num'], c['name'], c['outcome'], c['detail']) for c in s['checks']])
+            db.executemany('INSERT INTO requests VALUES (?, ?, ?, ?, ?, ?)',
+                           [(run_id, r['method'], route_of(r['path']), r['status'], r['ttfb'], r['total'])
+                            for r in [r for c in s['checks'] for r in c['requests']] + s.get('unclaimed', [])])
+    return run_id
+
+
+def select_runs(db, selector, base=None, mode=None):
+    """Run ids matching a selector, among runs of `base` and `mode` ('check' or 'probe') when given.
+
+    `42` is one run id; `last` and `last-N` count back from the newest run, and `last-A..last-B`
+    is every run from A back to B back; `version=V` is every run of a deploy; `since=T` and
+    `T1..T2` are windows on started_at (ISO prefixes compare as text).
+    """
+    where, args = [], []
+    if base:
+        where.append('base = ?')
+        args.append(base)
+    if mode:
+        # --daemon probes read page 1 only, so their timings are a different workload from check runs
+        where.append('mode = ?')
+        args.append(mode)
+    cond = ' AND '.join(where) or '1'
+    if selector.isdigit():
+        rows = db.execute(f'SELECT id FROM runs WHERE id = ? AND {cond}', [int(selector)] + args)
+    elif selector == 'last' or selector.startswith('last-'):
+        ends = [0 if s == 'last' else int(s[5:]) for s in selector.split('..')]
+        rows = db.execute(f'SELECT id FROM runs WHERE {cond} ORDER BY started_at DESC, id DESC LIMIT ? OFFSET ?',
+                          args + [max(ends) - min(ends) + 1, min(ends)])
+    elif selector.startswith('version='):
+        rows = db.execute(f'SELECT id FROM runs WHERE version = ? AND {cond}', [selector[8:]] + args)
+    elif selector.startswith('since='):
+        rows = db.execute(f'SELECT id FROM runs WHERE started_at >= ? AND {cond}', [selector[6:]] + args)
+    elif '..' in selector:
+        start, end = selector.split('..', 1)
+        # An end given as a date covers that whole day
+        rows = db.execute(f'SELECT id FROM runs WHERE started_at >= ? AND started_at < ? AND {cond}',
+                          [start, end + '\uffff'] + args)
+    else:
+        raise ValueError(f'unrecognised run selector: {selector}')
+    return [r[0] for r in rows]
+
+
+def latencies(db, run_ids):
+    """{(method, route): [total ms, ...]} over successful requests of the given runs."""
+    out = {}
+    marks = ','.join('?' * len(run_ids))
+    for method, route, ms in db.execute(
+            f'SELECT method, route, total_ms FROM requests WHERE run_id IN ({marks}) AND status BETWEEN 200 AND 399',
+            run_ids):
+        out.setdefault((method, route), []).append(ms)
+    return out
+
+
+def outcomes(db, run_ids):
+    """{(section, check name): fraction of runs in which it passed}."""
+    marks = ','.join('?' * len(run_ids))
+    return {(sec, name): passed / total for sec, name, passed, total in db.execute(
+        f"SELECT section, name, SUM(outcome = 'pass'), COUNT(*) FROM checks WHERE run_id IN ({marks}) "
+        'GROUP BY section, name', run_ids)}
+
+
+def mann_whitney(old, new):
+    """One-sided p-value that `new` tends to be larger than `old` (normal approximation, tie-corrected)."""
+    n1, n2 = len(old), len(new)
+    pooled = sorted([(v, 0) for v in old] + [(v, 1) for v in new])
+    n = n1 + n2
+    rank_new, ties, i = 0.0, 0.0, 0
+    while i < n:
+        j = i
+        while j < n and pooled[j][0] == pooled[i][0]:
+            j += 1
+        avg = (i + j + 1) / 2  # ranks are 1-based
+        rank_new += avg * sum(1 for k in range(i, j) if pooled[k][1])
+        ties += (j - i) ** 3 - (j - i)
+        i = j
+    u = rank_new - n2 * (n2 + 1) / 2
+    var = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if var <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(var)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(db, old_ids, new_ids, alpha=0.01, min_change=0.10, min_samples=5, out=sys.stdout):
+    """Prints per-route median/p95 shifts and flags regressions; returns the flagged (method, route) keys."""
+    old, new = latencies(db, old_ids), latencies(db, new_ids)
+    p95 = lambda xs: sorted(xs)[max(0, math.ceil(0.95 * len(xs)) - 1)]
+    print(f'  {"request":<40}{"n old":>7}{"n new":>7}{"p50 old":>10}{"p50 new":>10}{"Δp50":>8}'
+          f'{"p95 old":>10}{"p95 new":>10}{"p":>9}', file=out)
+    flagged = []
+    for key in sorted(set(old) | set(new), key=lambda k: k[1]):
+        a, b = old.get(key, []), new.get(key, [])
+        label = f'{key[0]} {key[1]}'
+        if len(a) < min_samples or len(b) < min_samples:
+            print(f'  {label:<40.40}{len(a):>7}{len(b):>7}  too few samples', file=out)
+            continue
+        ma, mb = statistics.median(a), statistics.median(b)
+        change = (mb - ma) / ma if ma else 0.0
+        p = mann_whitney(a, b)
+        verdict = ''
+        if p < alpha and change > min_change:
+            verdict = '  REGRESSION'
+            flagged.append(key)
+        print(f'  {label:<40.40}{len(a):>7}{len(b):>7}{ma:>8.1f}ms{mb:>8.1f}ms{change:>+8.0%}'
+              f'{p95(a):>8.1f}ms{p95(b):>8.1f}ms{p:>9.4f}{verdict}', file=out)
+    before, after = outcomes(db, old_ids), outcomes(db, new_ids)
+    broke = [k for k in after if after[k] < 1 and before.get(k, 0) == 1]
+    for sec, name in sorted(broke):
+        print(f'  newly failing: [{sec}] {name} (passed in {after[(sec, name)]:.0%} of new runs)', file=out)
+    return flagged
+
+
+def list_runs(db, limit=20, out=sys.stdout):
+    rows = db.execute('SELECT id, started_at, version, base, mode, passed, failed, duration_ms FROM runs '
+                      'ORDER BY started_at DESC, id DESC LIMIT ?', (limit,)).fetchall()
+    print(f'  {"id":>5}  {"started":<26}{"version":<14}{"mode":<8}{"pass":>6}{"fail":>6}{"ms":>9}  base', file=out)
+    for run_id, started, version, base, mode, passed, failed, ms in rows:
+        print(f'  {run_id:>5}  {started:<26}{version or "-":<14}{mode:<8}{passed:>6}{failed:>6}{ms:>9.0f}  {base}',
+              file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect and compare harness run history')
+    parser.add_argument('--db', default=HISTORY_DB, help='history database (default: CIS_HISTORY or ~/.cache/cis)')
+    parser.add_argument('--base', help='only consider runs against this base URL')
+    sub = parser.add_subparsers(dest='command', required=True)
+    r = sub.add_parser('runs', help='list recent runs')
+    r.add_argument('--limit', type=int, default=20)
+    c = sub.add_parser('compare', help='flag per-endpoint latency regressions between two selections of runs')
+    c.add_argument('old', help='run id, last, last-N, last-A..last-B, version=V, since=T or T1..T2')
+    c.add_argument('new', help='same forms as OLD')
+    c.add_argument('--alpha', type=float, default=0.01, help='significance level of the one-sided test')
+    c.add_argument('--min-change', type=float, default=0.10, help='smallest median increase worth flagging')
+    c.add_argument('--min-samples', type=int, default=5, help='requests needed on each side to test a route')
+    c.add_argument('--mode', choices=('check', 'probe', 'all'), default='check',
+                   help='only compare runs of this mode (default check; probe is --daemon)')
+    args = parser.parse_args(argv)
+
+    db = open_db(args.db)
+    if args.command == 'runs':
+        list_runs(db, args.limit)
+        return 0
+    try:
+        mode = None if args.mode == 'all' else args.mode
+        old_ids, new_ids = select_runs(db, args.old, args.base, mode), select_runs(db, args.new, args.base, mode)
+    except ValueError as e:
+        parser.error(str(e))
+    if not old_ids or not new_ids:
+        print(f'No runs match {args.old if not old_ids else args.new}.')
+        return 2
+    print(f'Comparing {len(old_ids)} {args.mode} run(s) [{args.old}] with {len(new_ids)} [{args.new}]')
+    if min(len(old_ids), len(new_ids)) == 1:
+        print('  one run has too few requests per route to test; compare windows, e.g. last-19..last-10 last-9..last')
+    flagged = compare(db, old_ids, new_ids, args.alpha, args.min_change, args.min_samples)
+    print(f'{len(flagged)} regression(s).' if flagged else 'No regressions.')
+    return 1 if flagged else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Load generation for the CIS dashboard request mix."""
+import collections, email.utils, itertools, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from cis_runner import summarize
+
+
+class Recorder:
+    """Thread-safe per-endpoint latency and error accounting."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, path, status, elapsed):
+        with self.lock:
+            self.latencies.setdefault(path, []).append(elapsed)
+            self.errors.setdefault(path, 0)
+            if status == 0 or status >= 400:
+                self.errors[path] += 1
+
+    def report(self, wall):
+        with self.lock:
+            rows = {}
+            for path, lat in self.latencies.items():
+                rows[path] = dict(summarize(lat), requests=len(lat), errors=self.errors[path],
+                                  rps=len(lat) / wall if wall else 0.0)
+            return rows
+
+
+def retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
+class AIMDLimiter:
+    """Additive-increase/multiplicative-decrease cap on requests in flight.
+
+    Each successful response raises the limit by 1/limit, about one slot per round of responses.
+    A 429, a 5xx, a transport error, or a smoothed latency above `tolerance` times the best seen
+    (plus `slack` seconds) multiplies it by `backoff`, at most once per round: responses to
+    requests admitted before the last decrease do not cut again. A Retry-After on a 429 or 503
+    holds back new requests until it expires. Other 4xx responses leave the limit alone.
+    """
+
+    def __init__(self, maximum, minimum=1, initial=1, backoff=0.5, tolerance=2.0, slack=0.010):
+        self.minimum, self.maximum = minimum, maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.backoff, self.tolerance, self.slack = backoff, tolerance, slack
+        self.cond = threading.Condition()
+        self.inflight = 0
+        self.epoch = 0
+        self.best = self.smoothed = None
+        self.resume_at = 0.0
+        self.paused = 0.0
+        self.cuts = collections.Counter()
+        self.t0 = time.perf_counter()
+        self.trace = [(0.0, int(self.limit))]  # (seconds into the run, whole slots) at every change
+
+    def acquire(self, deadline=None):
+        """Waits for a free slot outside any Retry-After pause; returns a token for release(), or None at `deadline`."""
+        with self.cond:
+            while True:
+                now = time.perf_counter()
+                if deadline is not None and now >= deadline:
+                    return None
+                if now >= self.resume_at and self.inflight < int(self.limit):
+                    self.inflight += 1
+                    return self.epoch
+                wait = self.resume_at - now if now < self.resume_at else None
+                if deadline is not None:
+                    wait = min(wait or deadline - now, deadline - now)
+                self.cond.wait(wait)
+
+    def release(self, token, status, elapsed, headers=None):
+        with self.cond:
+            self.inflight -= 1
+            now = time.perf_counter()
+            reason = 'transport' if status == 0 else 'HTTP 429' if status == 429 else '5xx' if status >= 500 else None
+            if reason is None and status < 400:
+                self.best = elapsed if self.best is None else min(self.best, elapsed)
+                self.smoothed = elapsed if self.smoothed is None else 0.9 * self.smoothed + 0.1 * elapsed
+                if self.smoothed > self.best * self.tolerance + self.slack:
+                    reason = 'latency'
+            wait = retry_after((headers or {}).get('retry-after')) if status in (429, 503) else None
+            if wait:
+                until = now + wait
+                if until > self.resume_at:
+                    self.paused += until - max(now, self.resume_at)
+                    self.resume_at = until
+            if reason and token == self.epoch:
+                self.epoch += 1
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self.smoothed = None
+                self.cuts[reason] += 1
+            elif reason is None and status < 400:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if int(self.limit) != self.trace[-1][1]:
+                self.trace.append((now - self.t0, int(self.limit)))
+            self.cond.notify_all()
+
+    def sustained(self, since=0.0):
+        """Time-weighted mean of the whole-slot limit from `since` seconds into the run until now."""
+        end = time.perf_counter() - self.t0
+        with self.cond:
+            points = list(self.trace)
+        area, span = 0.0, 0.0
+        for (t, limit), (t_next, _) in zip(points, points[1:] + [(end, None)]):
+            lo, hi = max(t, since), min(t_next, end)
+            if hi > lo:
+                area += limit * (hi - lo)
+                span += hi - lo
+        return area / span if span else float(points[-1][1])
+
+
+def run_load(fetch, paths, duration, concurrency=8, rps=None, recorder=None, limiter=None):
+    """Replays `paths` round-robin for `duration` seconds; fetch(path) returns an HTTP status.
+
+    Without `rps` this is closed-loop: `concurrency` workers each issue the next request as soon as
+    the previous one returns. With `rps` requests are started on a fixed schedule (open-loop) by up
+    to `concurrency` workers, and latency is measured from the scheduled start so a backed-up
+    server is not hidden by the generator slowing down. A `recorder` other than the default
+    Recorder can be passed to observe results as they arrive.
+
+    With an AIMDLimiter (closed-loop only) workers take a slot from it before every request, so
+    `concurrency` is the ceiling and the limiter decides how many are in flight. fetch may then
+    return (status, lower-cased headers) so Retry-After is seen.
+    """
+    if limiter is not None and rps:
+        raise ValueError('an adaptive limiter needs closed-loop load')
+    rec = recorder or Recorder()
+    mix = itertools.cycle(paths)
+    mix_lock = threading.Lock()
+
+    def next_path():
+        with mix_lock:
+            return next(mix)
+
+    def one(path, start):
+        result = fetch(path)
+        status, headers = result if isinstance(result, tuple) else (result, None)
+        elapsed = time.perf_counter() - start
+        rec.record(path, status, elapsed)
+        return status, headers, elapsed
+
+    def limited(deadline):
+        token = limiter.acquire(deadline)
+        if token is None:
+            return False
+        start, status, headers = time.perf_counter(), 0, None
+        try:
+            status, headers, _ = one(next_path(), start)
+        finally:
+            limiter.release(token, status, time.perf_counter() - start, headers)
+        return True
+
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if rps:
+            interval = 1.0 / rps
+            for i in itertools.count():
+                start = t0 + i * interval
+                if start >= deadline:
+                    break
+                delay = start - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(one, next_path(), start)
+        else:
+            def worker():
+                while time.perf_counter() < deadline:
+                    if limiter is None:
+                        one(next_path(), time.perf_counter())
+                    elif not limited(deadline):
+                        return
+            for _ in range(concurrency):
+                pool.submit(worker)
+    wall = time.perf_counter() - t0
+    return rec.report(wall), wall
+
+
+def print_load_report(rows, wall, out=None):
+    total = sum(r['requests'] for r in rows.values())
+    errors = sum(r['errors'] for r in rows.values())
+    print(f'\n{total} requests in {wall:.1f}s -- {total / wall if wall else 0:.1f} req/s, '
+          f'{100 * errors / total if total else 0:.2f}% errors', file=out)
+    print(f'  {"endpoint":<28}{"reqs":>7}{"req/s":>8}{"err%":>7}{"p50":>9}{"p95":>9}{"p99":>9}', file=out)
+    for path, r in sorted(rows.items()):
+        err = 100 * r['errors'] / r['requests'] if r['requests'] else 0
+        print(f'  {path:<28}{r["requests"]:>7}{r["rps"]:>8.1f}{err:>7.2f}'
+              f'{r["p50"]:>7.1f}ms{r["p95"]:>7.1f}ms{r["p99"]:>7.1f}ms', file=out)
+    return total, errors
+
+
+def print_limiter_report(limiter, wall, out=None):
+    """Prints and returns the concurrency the limiter held over the second half of the run."""
+    sustained = limiter.sustained(wall / 2)
+    peak = max(limit for _, limit in limiter.trace)
+    cuts = ', '.join(f'{reason} x{n}' for reason, n in limiter.cuts.most_common()) or 'none'
+    print(f'\nadaptive concurrency: sustained {sustained:.1f} in flight over the second half '
+          f'(peak {peak}, ceiling {limiter.maximum}); back-offs: {cuts}', file=out)
+    if limiter.paused:
+        # A pause can run past the end of the run; count only the part inside it
+        print(f'  held back {min(limiter.paused, wall):.1f}s of {wall:.1f}s by Retry-After', file=out)
+    return sustained
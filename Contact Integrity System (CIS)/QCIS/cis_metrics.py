@@ -0,0 +1,132 @@
+"""Prometheus text-format export of probe results, served over HTTP or written as a textfile."""
+import os, tempfile, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cis_runner import route_of
+
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**kv):
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in kv.items()) + '}'
+
+
+class Metrics:
+    """Accumulates cis_report.build_report() dicts into check and latency series; render() is thread-safe."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.success = {}  # (section, check) -> 0/1 on the latest run
+        self.outcomes = {}  # (section, check, outcome) -> count
+        self.requests = {}  # (method, route, code) -> count
+        self.histograms = {}  # (method, route) -> [bucket counts..., sum, count]
+        self.runs = 0
+        self.last_run = {}
+
+    def observe(self, report, finished_at):
+        with self.lock:
+            self.runs += 1
+            self.last_run = {'timestamp': finished_at, 'duration': report['duration'] / 1000,
+                             'passed': report['passed'], 'failed': report['failed'],
+                             'timeouts': report.get('timeouts', 0)}
+            for s in report['sections']:
+                for c in s['checks']:
+                    key = (s['num'], c['name'])
+                    self.success[key] = int(c['outcome'] == 'pass')
+                    out = key + (c['outcome'],)
+                    self.outcomes[out] = self.outcomes.get(out, 0) + 1
+                    for r in c['requests']:
+                        self._request(r)
+
+    def _request(self, r):
+        route = route_of(r['path'])
+        key = (r['method'], route, r['status'])
+        self.requests[key] = self.requests.get(key, 0) + 1
+        hist = self.histograms.setdefault((r['method'], route), [0] * len(self.buckets) + [0.0, 0])
+        seconds = r['total'] / 1000
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += seconds
+        hist[-1] += 1
+
+    def render(self):
+        with self.lock:
+            out = [
+                '# HELP cis_probe_runs_total Probe runs completed.',
+                '# TYPE cis_probe_runs_total counter',
+                f'cis_probe_runs_total {self.runs}',
+            ]
+            if self.last_run:
+                out += [
+                    '# HELP cis_probe_last_run_timestamp_seconds Unix time the latest probe run finished.',
+                    '# TYPE cis_probe_last_run_timestamp_seconds gauge',
+                    f'cis_probe_last_run_timestamp_seconds {self.last_run["timestamp"]:.3f}',
+                    '# HELP cis_probe_last_run_duration_seconds Wall time of the latest probe run.',
+                    '# TYPE cis_probe_last_run_duration_seconds gauge',
+                    f'cis_probe_last_run_duration_seconds {self.last_run["duration"]:.6f}',
+                    '# HELP cis_probe_checks_failed Checks that failed on the latest probe run.',
+                    '# TYPE cis_probe_checks_failed gauge',
+                    f'cis_probe_checks_failed {self.last_run["failed"]}',
+                    '# HELP cis_probe_checks_timed_out Checks that ran out of time on the latest probe run.',
+                    '# TYPE cis_probe_checks_timed_out gauge',
+                    f'cis_probe_checks_timed_out {self.last_run["timeouts"]}',
+                ]
+            out += ['# HELP cis_check_success Whether the check passed (1) or failed (0) on the latest run.',
+                    '# TYPE cis_check_success gauge']
+            out += [f'cis_check_success{labels(section=sec, check=name)} {v}'
+                    for (sec, name), v in sorted(self.success.items())]
+            out += ['# HELP cis_check_total Check outcomes across all runs.', '# TYPE cis_check_total counter']
+            out += [f'cis_check_total{labels(section=sec, check=name, outcome=o)} {n}'
+                    for (sec, name, o), n in sorted(self.outcomes.items())]
+            out += ['# HELP cis_requests_total Probe requests by route and HTTP status (0 = no response).',
+                    '# TYPE cis_requests_total counter']
+            out += [f'cis_requests_total{labels(method=m, route=r, code=c)} {n}'
+                    for (m, r, c), n in sorted(self.requests.items())]
+            out += ['# HELP cis_request_duration_seconds Total time of probe requests by route.',
+                    '# TYPE cis_request_duration_seconds histogram']
+            for (m, r), hist in sorted(self.histograms.items()):
+                for bound, n in zip(self.buckets, hist):
+                    out.append(f'cis_request_duration_seconds_bucket{labels(method=m, route=r, le=f"{bound:g}")} {n}')
+                out += [f'cis_request_duration_seconds_bucket{labels(method=m, route=r, le="+Inf")} {hist[-1]}',
+                        f'cis_request_duration_seconds_sum{labels(method=m, route=r)} {hist[-2]:.6f}',
+                        f'cis_request_duration_seconds_count{labels(method=m, route=r)} {hist[-1]}']
+        return '\n'.join(out) + '\n'
+
+
+def write_textfile(path, metrics):
+    """Atomic write for node_exporter's textfile collector, which must never see a partial file."""
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix='.cis-', suffix='.prom')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(metrics.render())
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def serve(metrics, port, host='0.0.0.0'):
+    """Serves GET /metrics on a background thread; returns the server."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,201 @@
+"""Streaming walker and deep-page latency profiler for the backend's page/limit list endpoints."""
+import contextvars, json, math, queue, statistics, threading
+
+MAX_LIMIT = 100  # paginationSchema caps limit at 100
+
+_decoder = json.JSONDecoder()
+_WS = ' \t\n\r'
+
+
+def iter_array(text, key='data'):
+    """Yields the elements of the top-level `key` array one at a time without building the list."""
+    start = text.find(f'"{key}"')
+    if start < 0:
+        return
+    i = text.index('[', start) + 1
+    n = len(text)
+    while True:
+        while i < n and text[i] in _WS:
+            i += 1
+        if i >= n or text[i] == ']':
+            return
+        item, i = _decoder.raw_decode(text, i)
+        yield item
+        while i < n and text[i] in _WS:
+            i += 1
+        if i < n and text[i] == ',':
+            i += 1
+
+
+def read_pagination(text):
+    """The trailing `pagination` object of a list response, or None if there is none."""
+    at = text.rfind('"pagination"')
+    if at < 0:
+        return None
+    i = text.index(':', at) + 1
+    while text[i] in _WS:
+        i += 1
+    try:
+        return _decoder.raw_decode(text, i)[0]
+    except ValueError:
+        return None
+
+
+def with_page(path, page, limit):
+    sep = '&' if '?' in path else '?'
+    return f'{path}{sep}page={page}&limit={limit}'
+
+
+class PageWalker:
+    """Iterates every row of a paginated endpoint, fetching page n+1 while page n is consumed.
+
+    fetch(path) returns (status, body text). Only the page being consumed and the one being
+    prefetched are held in memory. After iteration `rows`, `pages` and `total` (the server's
+    pagination.total from the first page) describe what was walked.
+    """
+
+    def __init__(self, fetch, path, limit=MAX_LIMIT, prefetch=True, max_pages=None):
+        self.fetch = fetch
+        self.path = path
+        self.limit = limit
+        self.prefetch = prefetch
+        self.max_pages = max_pages
+        self.rows = 0
+        self.pages = 0
+        self.total = None
+
+    def _get(self, page):
+        path = with_page(self.path, page, self.limit)
+        code, body = self.fetch(path)
+        if code != 200:
+            raise RuntimeError(f'HTTP {code} for {path}')
+        return body
+
+    def _bodies(self):
+        page = 1
+        if not self.prefetch:
+            while True:
+                body = self._get(page)
+                yield body
+                page += 1
+                if self._last_page(body, page):
+                    return
+        ahead = queue.Queue(maxsize=1)
+        stop = threading.Event()
+
+        def producer():
+            p = page
+            while not stop.is_set():
+                try:
+                    body = self._get(p)
+                except Exception as e:
+                    ahead.put(e)
+                    return
+                ahead.put(body)
+                p += 1
+                if self._last_page(body, p):
+                    ahead.put(None)
+                    return
+
+        # Run the producer in our context so its requests are traced to the consuming section
+        t = threading.Thread(target=contextvars.copy_context().run, args=(producer,), daemon=True)
+        t.start()
+        try:
+            while True:
+                body = ahead.get()
+                if body is None:
+                    return
+                if isinstance(body, Exception):
+                    raise body
+                yield body
+        finally:
+            stop.set()
+            while t.is_alive():
+                try:
+                    ahead.get_nowait()
+                except queue.Empty:
+                    t.join(0.01)
+
+    def _last_page(self, body, next_page):
+        meta = read_pagination(body)
+        if meta is None:
+            return True
+        if self.max_pages and next_page > self.max_pages:
+            return True
+        return next_page > meta.get('pages', 0)
+
+    def __iter__(self):
+        for body in self._bodies():
+            self.pages += 1
+            if self.total is None:
+                meta = read_pagination(body) or {}
+                self.total = meta.get('total')
+            for row in iter_array(body):
+                self.rows += 1
+                yield row
+
+
+def sample_pages(pages, samples):
+    """Up to about `samples` distinct pages from 1 to `pages`: half log-spaced, half evenly spaced."""
+    if pages <= samples:
+        return list(range(1, pages + 1))
+    half = max(2, samples // 2)
+    picks = {1, pages}
+    picks.update(round(math.exp(math.log(pages) * i / (half - 1))) for i in range(half))
+    picks.update(round(1 + (pages - 1) * i / (half - 1)) for i in range(half))
+    return sorted(picks)
+
+
+def growth_exponent(points):
+    """Least-squares b in (latency - latency at page 1) ~ (page - 1)^b, or None with too few points.
+
+    Offset pagination makes the database skip (page - 1) * limit rows, so b near 1 is the
+    expected linear cost and b well above 1 means deep pages get disproportionately slower.
+    """
+    base = points[0][1]
+    xs, ys = [], []
+    for page, ms in points[1:]:
+        if ms > base and page > 1:
+            xs.append(math.log(page - 1))
+            ys.append(math.log(ms - base))
+    if len(xs) < 3:
+        return None
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    sxx = sum((x - mx) ** 2 for x in xs)
+    if sxx == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx
+
+
+def profile_depth(fetch, path, limit=20, samples=12, repeats=3):
+    """Median latency per sampled page of `path`; fetch(path) returns (status, elapsed seconds, body).
+
+    Returns a dict with the page count, the sampled (page, median ms) points, deepest/first
+    latency ratio and growth exponent.
+    """
+    code, _, body = fetch(with_page(path, 1, limit))
+    if code != 200:
+        raise RuntimeError(f'HTTP {code} for {path}')
+    meta = read_pagination(body) or {}
+    pages = max(1, meta.get('pages') or 1)
+    points = []
+    for page in sample_pages(pages, samples):
+        timings = []
+        for _ in range(repeats):
+            code, elapsed, _ = fetch(with_page(path, page, limit))
+            if code != 200:
+                raise RuntimeError(f'HTTP {code} for {with_page(path, page, limit)}')
+            timings.append(elapsed * 1000)
+        points.append((page, statistics.median(timings)))
+    ratio = points[-1][1] / points[0][1] if points[0][1] else 0.0
+    return {'path': path, 'limit': limit, 'pages': pages, 'total': meta.get('total'),
+            'points': points, 'ratio': ratio, 'exponent': growth_exponent(points)}
+
+
+def classify_depth(profile, superlinear=1.2, growth=1.5, min_excess_ms=5.0):
+    """Growth below `min_excess_ms` in absolute terms is treated as noise, whatever its shape."""
+    points = profile['points']
+    if profile['ratio'] <= growth or points[-1][1] - points[0][1] < min_excess_ms:
+        return 'flat'
+    b = profile['exponent']
+    return 'SUPER-LINEAR' if b is not None and b > superlinear else 'linear growth'
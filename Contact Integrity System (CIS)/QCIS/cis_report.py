@@ -0,0 +1,51 @@
+"""Machine-readable run reports (JSON and JUnit XML) for the CIS dashboard harness."""
+import json
+import xml.etree.ElementTree as ET
+
+
+def build_report(sections, base, started_at, duration):
+    sections = [s.as_dict() for s in sorted(sections, key=lambda s: s.num)]
+    return {
+        'base': base,
+        'started_at': started_at,
+        'duration': round(duration * 1000, 3),
+        'passed': sum(s['passed'] for s in sections),
+        'failed': sum(s['failed'] for s in sections),
+        'timeouts': sum(s.get('timeouts', 0) for s in sections),
+        'sections': sections,
+    }
+
+
+def write_json(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+
+
+def write_junit(path, report):
+    """One <testsuite> per section and one <testcase> per check; a case's time is its requests' total.
+
+    Timed-out checks are JUnit errors (type "timeout") so CI shows them apart from failures.
+    """
+    timeouts = report.get('timeouts', 0)
+    root = ET.Element('testsuites', name='cis-dashboard', tests=str(report['passed'] + report['failed'] + timeouts),
+                      failures=str(report['failed']), errors=str(timeouts), time=f'{report["duration"] / 1000:.3f}')
+    for s in report['sections']:
+        n_timeouts = s.get('timeouts', 0)
+        suite = ET.SubElement(root, 'testsuite', name=f'[{s["num"]}] {s["title"]}',
+                              tests=str(s['passed'] + s['failed'] + n_timeouts), failures=str(s['failed']),
+                              errors=str(n_timeouts), time=f'{s["duration"] / 1000:.3f}',
+                              timestamp=report['started_at'])
+        for c in s['checks']:
+            elapsed = sum(r['total'] for r in c['requests']) / 1000
+            case = ET.SubElement(suite, 'testcase', classname=f'cis_dashboard.section{s["num"]}',
+                                 name=c['name'], time=f'{elapsed:.3f}')
+            if c['outcome'] == 'fail':
+                ET.SubElement(case, 'failure', message=c['detail'] or c['name'])
+            elif c['outcome'] == 'timeout':
+                ET.SubElement(case, 'error', type='timeout', message=c['detail'] or c['name'])
+            if c['requests']:
+                ET.SubElement(case, 'system-out').text = '\n'.join(
+                    f'{r["method"]} {r["path"]} -> {r["status"]}  dns {r["dns"]:.1f} connect {r["connect"]:.1f} '
+                    f'tls {r["tls"]:.1f} ttfb {r["ttfb"]:.1f} total {r["total"]:.1f} ms' for r in c['requests'])
+    ET.ElementTree(root).write(path, encoding='utf-8', xml_declaration=True)
@@ -0,0 +1,214 @@
+"""Dependency-aware scheduler for the CIS dashboard harness sections."""
+import contextvars, math, os, re, sys, time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from cis_client import TIMEOUTS, TRACE
+
+WORKERS = int(os.environ.get('CIS_WORKERS', '4'))
+FANOUT_LIMIT = int(os.environ.get('CIS_FANOUT', '4'))
+FANOUT_TIMEOUT = float(os.environ.get('CIS_FANOUT_TIMEOUT', '10'))
+ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies):
+    """Latency distribution in milliseconds for a list of durations in seconds."""
+    ms = sorted(x * 1000 for x in latencies)
+    return {
+        'n': len(ms),
+        'min': ms[0] if ms else 0.0,
+        'mean': sum(ms) / len(ms) if ms else 0.0,
+        'p50': percentile(ms, 50),
+        'p95': percentile(ms, 95),
+        'p99': percentile(ms, 99),
+        'max': ms[-1] if ms else 0.0,
+    }
+
+
+def format_summary(stats):
+    return ' '.join(f'{k} {stats[k]:.1f}ms' for k in ('p50', 'p95', 'p99', 'max'))
+
+
+class FanOut:
+    def __init__(self, results, latencies, wall, limit):
+        self.results = results
+        self.latencies = latencies
+        self.wall = wall
+        self.limit = limit
+
+    def describe(self):
+        return (f'{len(self.results)} items, limit {self.limit}, wall {self.wall * 1000:.1f}ms; '
+                f'per item {format_summary(summarize(self.latencies))}')
+
+
+def fan_out(items, fetch, limit=FANOUT_LIMIT, timeout=FANOUT_TIMEOUT):
+    """Calls fetch(item, timeout) for every item with at most `limit` in flight.
+
+    Results and per-item latencies keep the order of `items`; an exception raised
+    by fetch is returned in place of its result. Each call runs in a copy of the
+    caller's context, so request traces land in the calling section.
+    """
+    items = list(items)
+
+    def timed(item):
+        t0 = time.perf_counter()
+        try:
+            result = fetch(item, timeout)
+        except Exception as e:
+            result = e
+        return result, time.perf_counter() - t0
+
+    contexts = [contextvars.copy_context() for _ in items]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(limit, len(items)))) as pool:
+        out = list(pool.map(lambda ctx, item: ctx.run(timed, item), contexts, items))
+    return FanOut([r for r, _ in out], [t for _, t in out], time.perf_counter() - t0, limit)
+
+
+def route_of(path):
+    """Budget key for a request path: query dropped, id-like segments replaced by ':id'."""
+    parts = path.split('?', 1)[0].split('/')
+    return '/'.join(':id' if ID_SEGMENT.match(p) else p for p in parts)
+
+
+def lateness(requests):
+    """Why the slowest of `requests` that ran out of time did so, or '' if none did."""
+    late = [r for r in requests if r.get('error') in TIMEOUTS]
+    if not late:
+        return ''
+    waited = max(r['total'] for r in late)
+    return f'timed out after {waited:.0f}ms' if waited else 'run deadline passed'
+
+
+class Section:
+    """One numbered block of checks. Only the worker running it touches its counters and output."""
+
+    def __init__(self, num, title, run, after=()):
+        self.num = num
+        self.title = title
+        self.run = run
+        self.after = tuple(after)
+        self.lines = []
+        self.checks = []
+        self.trace = []
+        self.claimed = 0
+        self.passed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.duration = 0.0
+
+    def check(self, name, condition, detail=''):
+        """Records a check; it is credited with every request the section made since the previous one.
+
+        A failing check whose requests ran out of time is recorded as TIMEOUT rather than FAIL.
+        """
+        requests = self.trace[self.claimed:]
+        self.claimed += len(requests)
+        # A check on data an earlier request never delivered inherits that request's timeout
+        late = lateness(requests) or (not requests and self.timed_out and lateness(self.trace))
+        if condition or not late:
+            self._record(name, 'pass' if condition else 'fail', detail, requests)
+        else:
+            self._record(name, 'timeout', f'{detail}; {late}' if detail else late, requests)
+        return bool(condition)
+
+    def _record(self, name, outcome, detail, requests):
+        if outcome == 'pass':
+            self.passed += 1
+        elif outcome == 'fail':
+            self.failed += 1
+        else:
+            self.timed_out += 1
+        self.lines.append(f'  {outcome.upper():<4}  {name}' + (f' -- {detail}' if detail else ''))
+        self.checks.append({'name': name, 'outcome': outcome, 'detail': str(detail), 'requests': requests})
+
+    def info(self, name, detail):
+        self.lines.append(f'  INFO  {name} -- {detail}')
+
+    def check_budgets(self, budgets):
+        worst = {}
+        for r in self.trace:
+            if r.get('error') in TIMEOUTS:
+                continue  # already reported as TIMEOUT by the check that made it
+            key = route_of(r['path'])
+            if key in budgets:
+                worst[key] = max(worst.get(key, 0.0), r['total'])
+        for key, ms in sorted(worst.items()):
+            self.check(f'Latency budget {key}', ms <= budgets[key], f'max {ms:.0f}ms / budget {budgets[key]:g}ms')
+
+    def execute(self, state, broken, budgets=None, deadline=None):
+        missing = [n for n in self.after if n in broken]
+        if missing:
+            # A prerequisite that only ran out of time leaves this section inconclusive, not failed
+            late = all(broken[n] == 'timeout' for n in missing)
+            self._record('Prerequisites completed', 'timeout' if late else 'fail',
+                         f'section(s) {missing} did not complete', [])
+            return False
+        if deadline is not None and time.perf_counter() >= deadline:
+            self._record('Section started', 'timeout', 'run deadline passed', [])
+            return False
+        token = TRACE.set(self.trace)
+        t0 = time.perf_counter()
+        try:
+            self.run(self, state)
+            return True
+        except Exception as e:
+            # An exception after a request ran out of time (an empty body, say) is part of that timeout
+            requests = self.trace[self.claimed:]
+            self.claimed += len(requests)
+            detail, late = f'{type(e).__name__}: {e}', lateness(self.trace)
+            self._record('Section completed', 'timeout' if late else 'fail',
+                         f'{detail}; {late}' if late else detail, requests)
+            return False
+        finally:
+            self.duration = time.perf_counter() - t0
+            TRACE.reset(token)
+            if budgets:
+                self.check_budgets(budgets)
+
+    def render(self):
+        return '\n'.join([f'\n[{self.num}] {self.title}'] + self.lines)
+
+    def as_dict(self):
+        return {'num': self.num, 'title': self.title, 'duration': round(self.duration * 1000, 3),
+                'passed': self.passed, 'failed': self.failed, 'timeouts': self.timed_out, 'checks': self.checks,
+                'unclaimed': self.trace[self.claimed:]}
+
+
+def run_sections(sections, state, workers=WORKERS, out=sys.stdout, budgets=None, deadline=None):
+    """Runs each section once its `after` sections are done; prints them in number order.
+
+    `budgets` maps route_of() keys to a latency ceiling in ms; every budgeted route a
+    section requested becomes a check of its own. Sections still waiting to start at
+    `deadline` (a time.perf_counter() value) are recorded as timed out instead of run.
+    Returns (passed, failed); timeouts are counted on the sections.
+    """
+    order = sorted(sections, key=lambda s: s.num)
+    pending = {s.num: s for s in order}
+    done, broken, running = set(), {}, {}
+    printed = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for num, s in list(pending.items()):
+                if all(n in done for n in s.after):
+                    running[pool.submit(s.execute, state, broken, budgets, deadline)] = s
+                    del pending[num]
+            if not running:
+                raise ValueError(f'unsatisfiable section dependencies: {sorted(pending)}')
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in finished:
+                s = running.pop(f)
+                done.add(s.num)
+                if not f.result():
+                    broken[s.num] = 'timeout' if s.timed_out and not s.failed else 'fail'
+            while printed < len(order) and order[printed].num in done:
+                print(order[printed].render(), file=out, flush=True)
+                printed += 1
+    return sum(s.passed for s in order), sum(s.failed for s in order)
@@ -0,0 +1,153 @@
+"""Sliding-window latency tracking, health sampling and drift detection for long soak runs.
+
+Pool exhaustion in database/connection.ts and memory growth in the Node process rarely fail
+a request outright; they show up as latency that creeps up over hours, pool waiters on
+/api/ready and, eventually, a restart (the uptime on /api/health goes back to zero). The
+analysis tests the per-window p95 series for a monotonic trend (Mann-Kendall, with Sen's
+slope) and for a shift (Pettitt), which also locates the window where degradation started.
+"""
+import json, math, re, statistics, threading, time
+
+from cis_load import Recorder
+from cis_runner import summarize
+
+POOL_DETAIL = re.compile(r'total=(\d+) idle=(\d+) waiting=(\d+)')
+
+
+class WindowedRecorder(Recorder):
+    """Recorder that also files every (latency, status) into a `step`-second bucket by completion time."""
+
+    def __init__(self, step, t0=None):
+        super().__init__()
+        self.step = step
+        self.t0 = time.monotonic() if t0 is None else t0
+        self.buckets = {}
+
+    def record(self, path, status, elapsed):
+        super().record(path, status, elapsed)
+        b = int((time.monotonic() - self.t0) // self.step)
+        with self.lock:
+            self.buckets.setdefault(b, []).append((elapsed, status))
+
+    def window(self, last, size):
+        """Summary of the `size` buckets ending with bucket `last`."""
+        with self.lock:
+            samples = [s for b in range(last - size + 1, last + 1) for s in self.buckets.get(b, ())]
+        errors = sum(1 for _, status in samples if status == 0 or status >= 400)
+        return dict(summarize([e for e, _ in samples]), index=last, start=(last - size + 1) * self.step,
+                    end=(last + 1) * self.step, requests=len(samples), errors=errors)
+
+
+class HealthSampler(threading.Thread):
+    """Polls /api/health and /api/ready every `interval` seconds until stop() is called.
+
+    curl(method, path) returns (status, body text).
+    """
+
+    def __init__(self, curl, interval, t0=None):
+        super().__init__(daemon=True)
+        self.curl = curl
+        self.interval = interval
+        self.t0 = time.monotonic() if t0 is None else t0
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(0 if not self.samples else self.interval):
+            self.samples.append(self.sample())
+
+    def sample(self):
+        at = time.monotonic() - self.t0
+        t = time.perf_counter()
+        code, body = self.curl('GET', '/api/health')
+        ms = (time.perf_counter() - t) * 1000
+        try:
+            health = json.loads(body)
+        except ValueError:
+            health = {}
+        database = health.get('database') or (health.get('checks') or {}).get('database')
+        pool = None
+        code_ready, body_ready = self.curl('GET', '/api/ready')
+        try:
+            detail = json.loads(body_ready)['checks']['pool']['detail']
+            m = POOL_DETAIL.search(detail)
+            pool = tuple(int(x) for x in m.groups()) if m else None
+        except (ValueError, KeyError, TypeError):
+            pass
+        return {'at': at, 'status': code, 'ms': ms, 'database': database, 'uptime': health.get('uptime'),
+                'pool': pool}
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def mann_kendall(series):
+    """(z, one-sided p of an upward trend, Sen's slope per step); p is 1.0 with fewer than 4 points."""
+    n = len(series)
+    if n < 4:
+        return 0.0, 1.0, 0.0
+    s = sum((series[j] > series[i]) - (series[j] < series[i]) for i in range(n) for j in range(i + 1, n))
+    ties = {}
+    for x in series:
+        ties[x] = ties.get(x, 0) + 1
+    var = (n * (n - 1) * (2 * n + 5) - sum(t * (t - 1) * (2 * t + 5) for t in ties.values())) / 18
+    z = 0.0 if var <= 0 or s == 0 else (s - 1 if s > 0 else s + 1) / math.sqrt(var)
+    slope = statistics.median((series[j] - series[i]) / (j - i) for i in range(n) for j in range(i + 1, n))
+    return z, 0.5 * math.erfc(z / math.sqrt(2)), slope
+
+
+def pettitt(series):
+    """(index of the first point after the most likely shift, approximate p); (None, 1.0) if too short."""
+    n = len(series)
+    if n < 4:
+        return None, 1.0
+    best_k, best_u, u = None, 0, 0
+    for k in range(n - 1):
+        # U_k = U_{k-1} + sum_j sign(x_k - x_j)
+        u += sum((series[k] > x) - (series[k] < x) for x in series)
+        if abs(u) > abs(best_u):
+            best_k, best_u = k, u
+    if best_k is None:
+        return None, 1.0
+    p = min(1.0, 2 * math.exp(-6 * best_u ** 2 / (n ** 3 + n ** 2)))
+    return best_k + 1, p
+
+
+def analyse(windows, health, stride=1, alpha=0.05, min_rise=0.10):
+    """Findings from the window summaries and health samples, as (message, seconds into the run) pairs.
+
+    Overlapping sliding windows are not independent, so the trend tests use every `stride`-th
+    window; pass the number of steps per window to test non-overlapping ones.
+    """
+    findings = []
+    errors = [w for w in windows if w['requests'] and w['errors']]
+    windows = [w for w in windows[::-1][::stride][::-1] if w['requests']]
+    p95 = [w['p95'] for w in windows]
+    # Gradual creep shows in the trend test, a sudden step in the change-point test
+    z, p, slope = mann_kendall(p95)
+    k, pk = pettitt(p95)
+    if (p < alpha and slope > 0) or pk < alpha:
+        k = k or 0
+        before, after = statistics.median(p95[:k] or p95), statistics.median(p95[k:])
+        if before and after / before - 1 > min_rise:
+            findings.append((f'p95 rises: Sen slope {slope:+.2f}ms per window (Mann-Kendall p={p:.4f}); '
+                             f'median p95 {before:.1f}ms -> {after:.1f}ms from window +{windows[k]["start"]:.0f}s'
+                             f'..+{windows[k]["end"]:.0f}s on (Pettitt p={pk:.4f})', windows[k]['start']))
+    if errors:
+        findings.append((f'errors in {len(errors)} window(s), first {errors[0]["errors"]} of '
+                         f'{errors[0]["requests"]} requests', errors[0]['end']))
+    for s in health:
+        if s['status'] != 200 or s['database'] not in (None, 'connected'):
+            findings.append((f'/api/health HTTP {s["status"]}, database {s["database"]}', s['at']))
+            break
+    for s in health:
+        if s['pool'] and s['pool'][2] > 0:
+            findings.append((f'database pool had {s["pool"][2]} waiting client(s)', s['at']))
+            break
+    uptimes = [(s['at'], s['uptime']) for s in health if isinstance(s['uptime'], (int, float))]
+    for (_, prev), (at, cur) in zip(uptimes, uptimes[1:]):
+        if cur < prev:
+            findings.append((f'backend restarted (uptime {prev}s -> {cur}s)', at))
+            break
+    return sorted(findings, key=lambda f: f[1])
@@ -0,0 +1,924 @@
+"""Local stand-in for the CIS API, serving the seed-test-data.sql population from memory.
+
+Run it and point the dashboard suite at it:
+
+    python cis_stub_server.py --port 8787
+    CIS_BASE=http://127.0.0.1:8787 python test_dashboard.py
+
+or let the suite start it in-process with `python test_dashboard.py --stub`.
+"""
+import argparse, base64, hashlib, hmac, json, queue, re, threading, time, uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+JWT_SECRET = 'dev_jwt_secret_change_in_production'
+JWT_TTL = 24 * 3600
+WEBHOOK_SECRET = 'dev_webhook_secret_change_in_production'
+HMAC_SECRET = 'dev_hmac_secret_change_in_production'
+ADMIN = {
+    'id': '9d6bbf59-be57-43c2-8705-7e6eeaf7b396', 'email': 'admin@qwickservices.com', 'name': 'CIS Admin',
+    'role': 'trust_safety', 'password': 'QwickCIS2026admin',
+}
+PERMISSIONS = ['alerts.view', 'alerts.action', 'cases.view', 'cases.action', 'risk.view', 'audit.view', 'users.view',
+               'enforcement.view', 'appeals.view', 'system_health.view', 'intelligence.view']
+EVENT_TYPES = {
+    'message.created', 'message.edited', 'message.deleted', 'transaction.initiated', 'transaction.completed',
+    'transaction.failed', 'transaction.cancelled', 'user.status_changed', 'enforcement.action_applied',
+    'enforcement.action_reversed', 'appeal.submitted', 'appeal.resolved', 'booking.created', 'booking.updated',
+    'booking.completed', 'booking.cancelled', 'booking.no_show', 'wallet.deposit', 'wallet.withdrawal',
+    'wallet.transfer', 'provider.registered', 'provider.updated', 'user.registered', 'user.contact_field_changed',
+    'rating.submitted', 'leakage.stage_advanced', 'relationship.updated',
+}
+# Laravel event names accepted by /api/webhooks/ingest and the CIS type each normalizes to (events/normalizer.ts)
+WEBHOOK_EVENTS = {
+    'booking-save': 'booking.created', 'booking-create': 'booking.created', 'booking-update': 'booking.updated',
+    'booking-complete': 'booking.completed', 'booking-cancel': 'booking.cancelled', 'booking-no-show': 'booking.no_show',
+    'save-payment': 'wallet.deposit', 'payment-deposit': 'wallet.deposit', 'payment-withdrawal': 'wallet.withdrawal',
+    'payment-transfer': 'wallet.transfer', 'provider-register': 'provider.registered',
+    'provider-update': 'provider.updated', 'user-register': 'user.registered', 'user-create': 'user.registered',
+    'dispute.filed': 'dispute.opened', 'dispute-create': 'dispute.opened', 'dispute.resolved': 'dispute.resolved',
+    'dispute-resolve': 'dispute.resolved', 'payment.refunded': 'refund.processed', 'refund-process': 'refund.processed',
+    'user.profile_updated': 'user.profile_updated', 'profile-update': 'user.profile_updated',
+    'chat.message_sent': 'message.created', 'chat.message_edited': 'message.edited',
+    'rating.submitted': 'rating.submitted', 'contact.field_changed': 'user.contact_field_changed',
+    'category-create': 'category.created', 'category-update': 'category.updated',
+}
+# routes/stats-v2.ts filter vocabulary: range -> seconds, granularity -> bucket seconds
+STATS_RANGES = {'last_24h': 86400, 'last_7d': 7 * 86400, 'last_30d': 30 * 86400}
+STATS_BUCKETS = {'hourly': 3600, 'daily': 86400, 'weekly': 7 * 86400}
+UUID = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.I)
+ISO_UTC = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(\.\d+)?Z$')
+
+USER_LOW_1 = 'd68ec8ce-20c1-4400-b6eb-4c19884ac48d'
+USER_LOW_2 = '55cc0cb7-aee7-4b07-a38e-c7d46ddd2a0d'
+RECEIVER = '6e385513-d91f-4141-b678-d9648cd82030'
+USER_MED_1 = 'aaaaaaaa-bbbb-cccc-dddd-000000000001'
+USER_HIGH_1 = 'aaaaaaaa-bbbb-cccc-dddd-000000000002'
+
+
+def b64url(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def make_jwt(claims, secret=JWT_SECRET):
+    header = b64url(json.dumps({'alg': 'HS256', 'typ': 'JWT'}, separators=(',', ':')).encode())
+    payload = b64url(json.dumps(claims, separators=(',', ':')).encode())
+    sig = hmac.new(secret.encode(), f'{header}.{payload}'.encode(), hashlib.sha256).digest()
+    return f'{header}.{payload}.{b64url(sig)}'
+
+
+def verify_jwt(token, secret=JWT_SECRET):
+    try:
+        header, payload, sig = token.split('.')
+        expected = hmac.new(secret.encode(), f'{header}.{payload}'.encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(b64url(expected), sig):
+            return None
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except ValueError:
+        return None
+    return claims if claims.get('exp', 0) > time.time() else None
+
+
+def seed(now=None):
+    """Tables matching src/backend/src/database/seed-test-data.sql plus the records it builds on."""
+    now = now or datetime.now(timezone.utc)
+    ago = lambda **kw: (now - timedelta(**kw)).isoformat()
+
+    users = [
+        {'id': USER_LOW_1, 'display_name': 'E2E Test Sender', 'email': 'e2e.sender@testdata.cis', 'phone': '555-867-5309',
+         'user_type': 'customer', 'service_category': None, 'trust_score': '50.00', 'status': 'active'},
+        {'id': USER_LOW_2, 'display_name': 'Test Sender', 'email': 'test.sender@testdata.cis', 'phone': '555-234-5678',
+         'user_type': 'customer', 'service_category': None, 'trust_score': '50.00', 'status': 'active'},
+        {'id': RECEIVER, 'display_name': 'Test Receiver', 'email': 'test.receiver@testdata.cis', 'phone': None,
+         'user_type': 'customer', 'service_category': None, 'trust_score': '50.00', 'status': 'active'},
+        {'id': USER_MED_1, 'display_name': 'Maria Chen', 'email': 'maria.chen@testdata.cis', 'phone': '555-199-0001',
+         'user_type': 'provider', 'service_category': 'Cleaning', 'trust_score': '55.00', 'status': 'active'},
+        {'id': USER_HIGH_1, 'display_name': 'James Rodriguez', 'email': 'james.rodriguez@testdata.cis', 'phone': '555-199-0002',
+         'user_type': 'provider', 'service_category': 'Plumbing', 'trust_score': '78.00', 'status': 'active'},
+        {'id': 'aaaaaaaa-bbbb-cccc-dddd-000000000003', 'display_name': 'CIS System', 'email': 'system@internal.cis', 'phone': None,
+         'user_type': None, 'service_category': None, 'trust_score': '50.00', 'status': 'active'},
+    ]
+    for n, (name, email, cat, score, status) in enumerate([
+            ('Kwame Asante', 'kwame.asante', 'Electrical', '72.00', 'active'),
+            ('Lucia Fernandez', 'lucia.fernandez', 'Moving', '45.00', 'restricted'),
+            ('David Kim', 'david.kim', 'Tutoring', '88.00', 'active'),
+            ('Mike Thompson', 'mike.thompson', 'Handyman', '38.00', 'active'),
+            ('Sarah Nguyen', 'sarah.nguyen', 'Pet Care', '62.00', 'active')], start=4):
+        users.append({'id': f'aaaaaaaa-bbbb-cccc-dddd-{n:012d}', 'display_name': name, 'email': f'{email}@testdata.cis',
+                      'phone': f'555-301-40{n - 3:02d}', 'user_type': 'provider', 'service_category': cat,
+                      'trust_score': score, 'status': status})
+    for i, u in enumerate(users):
+        u.update(verification_status='verified', created_at=ago(days=30 - i))
+
+    signals = []
+    low_types = ['CONTACT_PHONE', 'CONTACT_EMAIL', 'OFF_PLATFORM_INTENT', 'PAYMENT_EXTERNAL',
+                 'CONTACT_PHONE', 'CONTACT_EMAIL', 'OFF_PLATFORM_INTENT', 'CONTACT_MESSAGING_APP']
+    for u, uid in enumerate([USER_LOW_1, USER_LOW_2]):
+        for i, kind in enumerate(low_types):
+            signals.append({'id': str(uuid.UUID(int=0x5100 + u * 16 + i)), 'source_event_id': str(uuid.UUID(int=0xe000 + u * 16 + i)),
+                            'user_id': uid, 'signal_type': kind, 'confidence': f'{0.5 + i * 0.03:.3f}', 'evidence': {},
+                            'obfuscation_flags': [], 'pattern_flags': [], 'created_at': ago(hours=4, minutes=u * 30 + i)})
+    for i, (uid, kind, conf, mins) in enumerate([
+            (USER_MED_1, 'CONTACT_MESSAGING_APP', '0.850', 115), (USER_MED_1, 'PAYMENT_EXTERNAL', '0.780', 105),
+            (USER_MED_1, 'OFF_PLATFORM_INTENT', '0.820', 115), (USER_HIGH_1, 'PAYMENT_EXTERNAL', '0.920', 355),
+            (USER_HIGH_1, 'TX_REDIRECT_ATTEMPT', '0.880', 355), (USER_HIGH_1, 'GROOMING_LANGUAGE', '0.750', 325)], start=1):
+        signals.append({'id': f'11111111-0001-0001-0001-{i:012d}', 'source_event_id': f'eeeeeeee-0001-0001-0001-{i:012d}',
+                        'user_id': uid, 'signal_type': kind, 'confidence': conf, 'evidence': {}, 'obfuscation_flags': [],
+                        'pattern_flags': [], 'created_at': ago(minutes=mins)})
+
+    scores = [
+        {'id': 'a8512107-1cea-4ec2-97bf-8099b78e899a', 'user_id': USER_LOW_1, 'score': '31.80', 'tier': 'low',
+         'trend': 'stable', 'signal_count': 8, 'created_at': ago(hours=3, minutes=35)},
+        {'id': 'a39355a6-6900-4116-9beb-74c1c507f082', 'user_id': USER_LOW_2, 'score': '34.80', 'tier': 'low',
+         'trend': 'stable', 'signal_count': 8, 'created_at': ago(hours=3, minutes=20)},
+    ]
+
+    enforcement = [
+        {'id': '5e9068fd-bf07-44d6-87f8-153c61dedf98', 'user_id': USER_LOW_1, 'action_type': 'soft_warning',
+         'reason_code': 'LOW_RISK_FIRST_OFFENSE', 'risk_score_id': scores[0]['id'], 'reversed_at': None,
+         'metadata': {'shadow_mode': 'true'}, 'created_at': ago(hours=3, minutes=30)},
+        {'id': '9763b34e-517b-4ff2-8a56-0fa4a2571068', 'user_id': USER_LOW_2, 'action_type': 'soft_warning',
+         'reason_code': 'LOW_RISK_FIRST_OFFENSE', 'risk_score_id': scores[1]['id'], 'reversed_at': None,
+         'metadata': {'shadow_mode': 'true'}, 'created_at': ago(hours=3, minutes=15)},
+    ]
+
+    alerts = []
+    for i, (uid, priority, status, title, mins) in enumerate([
+            (USER_LOW_1, 'low', 'open', 'Off-platform contact sharing detected', 225),
+            (USER_LOW_2, 'low', 'assigned', 'Multiple off-platform payment references detected', 210),
+            (USER_MED_1, 'medium', 'in_progress', 'Escalation pattern: messaging app redirect + external payment', 100),
+            (USER_HIGH_1, 'high', 'resolved', 'High-confidence payment redirect with fee evasion intent', 350),
+            (USER_HIGH_1, 'low', 'dismissed', 'Ban evasion language detected (low confidence)', 320)], start=1):
+        alerts.append({'id': f'bbbbbbbb-0001-0001-0001-{i:012d}', 'user_id': uid, 'priority': priority, 'status': status,
+                       'title': title, 'description': title + '.', 'assigned_to': None if status == 'open' else ADMIN['id'],
+                       'auto_generated': True, 'created_at': ago(minutes=mins)})
+
+    cases = []
+    for i, (uid, status, title, mins) in enumerate([
+            (USER_LOW_1, 'open', 'Contact sharing investigation — E2E Test Sender', 220),
+            (USER_MED_1, 'investigating', 'Escalation pattern — Maria Chen (WhatsApp + Venmo redirect)', 95),
+            (USER_HIGH_1, 'closed', 'Fee evasion + ban evasion — James Rodriguez', 300)], start=1):
+        cases.append({'id': f'cccccccc-0001-0001-0001-{i:012d}', 'user_id': uid, 'status': status, 'title': title,
+                      'description': title + '.', 'assigned_to': ADMIN['id'], 'alert_ids': [alerts[i - 1]['id']],
+                      'created_at': ago(minutes=mins)})
+
+    notes = []
+    for i, (case, mins) in enumerate([(0, 218), (0, 120), (1, 90), (1, 45), (2, 345), (2, 330), (2, 285)], start=1):
+        notes.append({'id': f'dddddddd-0001-0001-0001-{i:012d}', 'case_id': cases[case]['id'], 'author': ADMIN['email'],
+                      'content': 'Seeded investigation note.', 'created_at': ago(minutes=mins)})
+
+    audit = []
+    entries = [('system', 'event.message.created', 'message', f'eeeeeeee-0000-0000-0000-{i:012d}', 250 - i * 5) for i in range(1, 5)]
+    entries += [('system', 'alert.created', 'alert', alerts[i]['id'], m) for i, m in ((0, 225), (2, 100), (3, 350))]
+    entries += [(ADMIN['email'], 'case.created', 'case', cases[0]['id'], 220), (ADMIN['email'], 'case.created', 'case', cases[1]['id'], 95),
+                (ADMIN['email'], 'case.closed', 'case', cases[2]['id'], 285), (ADMIN['email'], 'alert.assigned', 'alert', alerts[1]['id'], 205),
+                (ADMIN['email'], 'alert.status_changed', 'alert', alerts[2]['id'], 90), (ADMIN['email'], 'alert.resolved', 'alert', alerts[3]['id'], 300),
+                (ADMIN['email'], 'alert.dismissed', 'alert', alerts[4]['id'], 315),
+                ('system', 'enforcement.shadow.soft_warning', 'user', USER_LOW_1, 210),
+                ('system', 'enforcement.shadow.soft_warning', 'user', USER_LOW_2, 195)]
+    for i, (actor, action, etype, eid, mins) in enumerate(entries, start=1):
+        audit.append({'id': f'22222222-0001-0001-0001-{i:012d}', 'actor': actor,
+                      'actor_type': 'admin' if actor == ADMIN['email'] else 'system', 'action': action,
+                      'entity_type': etype, 'entity_id': eid, 'details': {'test_data': True}, 'timestamp': ago(minutes=mins)})
+
+    newest = lambda rows, key='created_at': sorted(rows, key=lambda r: r[key], reverse=True)
+    return {
+        'users': newest(users), 'risk_signals': newest(signals), 'risk_scores': newest(scores),
+        'enforcement_actions': newest(enforcement), 'alerts': alerts, 'cases': newest(cases),
+        'case_notes': notes, 'appeals': [], 'audit_logs': newest(audit, 'timestamp'), 'webhook_events': [],
+    }
+
+
+# detection/regex.ts, obfuscation.ts and keywords.ts, ported with re.ASCII so \d, \s and \b match what V8 matches
+PHONE_PATTERNS = [re.compile(p, re.A | f) for p, f in [
+    (r'(?<!\d)(?:\+?1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}(?!\d)', 0),
+    (r'(?<!\d)\+?[1-9]\d{0,2}[-.\s]?\d{2,4}[-.\s]?\d{3,4}[-.\s]?\d{3,4}(?!\d)', 0),
+    (r'(?<!\d)\d(?:\s\d){9,14}(?!\d)', 0),
+    (r'(?:(?:zero|one|two|three|four|five|six|seven|eight|nine)[\s,.-]+){7,}', re.I),
+]]
+EMAIL_PATTERNS = [re.compile(p, re.A | f) for p, f in [
+    (r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', 0),
+    (r'[a-zA-Z0-9._%+-]+\s*(?:\[at\]|@|\(at\)|\{at\}|\bat\b)\s*[a-zA-Z0-9.-]+\s*(?:\[dot\]|\(dot\)|\{dot\}|\bdot\b)'
+     r'\s*[a-zA-Z]{2,}', re.I),
+    (r'(?:[a-zA-Z]\s){3,}(?:@|\bat\b)\s*(?:[a-zA-Z]\s){3,}(?:\.|\bdot\b)\s*[a-zA-Z\s]{2,6}', re.I),
+]]
+URL_PATTERNS = [re.compile(p, re.A | re.I) for p in [
+    r'https?://[^\s<>"\']+', r'(?<!\S)www\.[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}[^\s<>"\']*',
+    r'(?:bit\.ly|tinyurl\.com|t\.co|goo\.gl|rb\.gy)/[a-zA-Z0-9]+',
+]]
+SOCIAL_PATTERNS = [re.compile(p, re.A | f) for p, f in [
+    (r'(?:^|\s)@[a-zA-Z0-9_]{3,30}(?:\s|$)', 0),
+    (r'(?:instagram|insta|ig|facebook|fb|twitter|tiktok|snapchat|snap)\s*[:\-]?\s*@?[a-zA-Z0-9_.]{3,30}', re.I),
+    (r'(?:i\s*n\s*s\s*t\s*a|f\s*b|t\s*w\s*i\s*t\s*t\s*e\s*r)\s*[:\-]?\s*@?[a-zA-Z0-9_.]{3,30}', re.I),
+]]
+EMOJI_DIGITS = {**{f'{d}️⃣': str(d) for d in range(10)}, '\U0001f51f': '10', '⓪': '0',
+                **{chr(0x2460 + d - 1): str(d) for d in range(1, 10)}}
+LEET = {'0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '8': 'b', '@': 'a', '$': 's', '!': 'i', '|': 'l',
+        '+': 't'}
+SPACED = re.compile(r'(?:^|(?<=\s))([a-zA-Z0-9](?:\s+[a-zA-Z0-9]){2,})(?=\s|$)', re.A)
+LEETSPEAK = re.compile(r'\b[a-zA-Z]*[0-9@$!|+][a-zA-Z]*[0-9@$!|+]*[a-zA-Z]*\b', re.A)
+SEPARATED = re.compile(r'([a-zA-Z0-9])([.\-|_/\\])\1*(?:\2[a-zA-Z0-9]){3,}', re.A)
+PARTIAL = [re.compile(p, re.A | re.I) for p in [
+    r'(?:number|phone|cell)\s+(?:starts?|begins?|is)\s+(?:with\s+)?\d{3,}',
+    r'(?:first|last)\s+(?:part|half|digits?)\s+(?:is|are)\s+\d{3,}', r'(?:email|address)\s+(?:starts?|begins?|is)\s+\w+',
+]]
+KEYWORDS = {
+    'CONTACT_MESSAGING_APP': ['whatsapp', 'whatapp', 'watsapp', 'wa', "what's app", 'whats app', 'telegram', 'tg',
+                              'telgram', 'signal', 'signal app', 'imessage', 'facetime', 'discord', 'disc', 'snapchat',
+                              'snap', 'wechat', 'line app', 'viber', 'kik', 'messenger', 'fb messenger'],
+    'PAYMENT_EXTERNAL': ['venmo', 'paypal', 'cashapp', 'cash app', 'ca$happ', 'zelle', 'apple pay', 'google pay', 'gpay',
+                         'bitcoin', 'btc', 'ethereum', 'eth', 'crypto', 'western union', 'moneygram', 'wire transfer',
+                         'bank transfer', 'direct deposit', 'cash only', 'pay directly', 'pay me directly',
+                         'outside the app', 'off platform payment'],
+    'OFF_PLATFORM_INTENT': ['text me', 'call me', 'dm me', 'message me', 'hit me up', 'hmu', 'reach me at',
+                            'contact me at', 'contact me on', 'contact me via', 'off the app', 'off platform',
+                            'outside the platform', 'take this offline', 'take this conversation offline',
+                            'talk privately', 'talk directly', 'lets move to', 'lets go to', 'switch to', 'my number is',
+                            'my email is', 'my handle is', 'add me on', 'find me on', 'follow me on'],
+    'GROOMING_LANGUAGE': ['trust me', 'i promise', 'between us', 'just this once', 'special deal', 'exclusive offer',
+                          "don't tell", 'keep this between', 'our secret', 'no need for the platform',
+                          'skip the middleman', 'save on fees', 'avoid the fee', 'no commission',
+                          "i'll give you a discount", 'better price privately', 'we can work something out',
+                          'side deal', 'privately', 'in private', 'just between us', 'special price',
+                          'cheaper outside', 'half price', 'save money', 'cut out middleman', 'no service fee',
+                          'pay me directly', 'i give discount', 'better rate', 'cash deal', 'cash payment',
+                          'negotiate price', 'off-app price'],
+}
+WORD_EDGE = re.compile(r'''[\s.,!?;:'"()\-/]''')
+
+
+def regex_matches(text):
+    """{'phone'|'email'|'url'|'social': count} after regex.ts deduplicateMatches (overlaps keep the longest)."""
+    counts = {}
+    for kind, patterns in (('phone', PHONE_PATTERNS), ('email', EMAIL_PATTERNS), ('url', URL_PATTERNS),
+                           ('social', SOCIAL_PATTERNS)):
+        spans = sorted(((m.start(), -len(m.group(0))) for p in patterns for m in p.finditer(text)))
+        end = -1
+        for start, neg in spans:
+            if start >= end:
+                counts[kind] = counts.get(kind, 0) + 1
+                end = start - neg
+    return counts
+
+
+def keyword_matches(text):
+    """[(signal type, keyword)] with keywords.ts word-boundary rules."""
+    lower, out = text.lower(), []
+    for category, words in KEYWORDS.items():
+        for word in words:
+            i = lower.find(word)
+            while i != -1:
+                j = i + len(word)
+                if (i == 0 or WORD_EDGE.match(lower[i - 1])) and (j == len(lower) or WORD_EDGE.match(lower[j])):
+                    out.append((category, word))
+                i = lower.find(word, i + 1)
+    return out
+
+
+def deobfuscate(text):
+    """(flags, normalized text, confidence) as obfuscation.ts detectObfuscation computes them."""
+    flags, boost = [], 0.0
+    spaced = [m.group(1) for m in SPACED.finditer(text)]
+    for run in spaced:
+        text = text.replace(run, re.sub(r'\s+', '', run), 1)
+    if spaced:
+        flags.append('spaced_characters')
+        boost += 0.2
+    emoji = [e for e in EMOJI_DIGITS if e in text]
+    for e in emoji:
+        text = text.replace(e, EMOJI_DIGITS[e])
+    if emoji:
+        flags.append('emoji_substitution')
+        boost += 0.25
+    leet = False
+    for word in LEETSPEAK.findall(text):
+        if len(word) >= 3 and not word.isdigit():
+            decoded = ''.join(LEET.get(c, c) for c in word)
+            if decoded != word:
+                text = text.replace(word, decoded, 1)
+                leet = True
+    if leet:
+        flags.append('leetspeak')
+        boost += 0.15
+    if any(p.search(text) for p in PARTIAL):
+        flags.append('partial_disclosure')
+        boost += 0.1
+    separated = [m.group(0) for m in SEPARATED.finditer(text)]
+    for run in separated:
+        text = text.replace(run, re.sub(r'[.\-|_/\\]', '', run), 1)
+    if separated:
+        flags.append('character_separators')
+        boost += 0.2
+    if len(flags) > 1:
+        boost += 0.1 * (len(flags) - 1)
+    return flags, text, min(1.0, boost)
+
+
+def detect(content):
+    """Signals detection/index.ts analyzeEvent would return for a message, without conversation context."""
+    flags, normalized, obf = deobfuscate(content)
+    counts = regex_matches(content)
+    keywords = set(keyword_matches(content))
+    if flags:
+        for kind, n in regex_matches(normalized).items():
+            counts[kind] = counts.get(kind, 0) + n
+        keywords |= set(keyword_matches(normalized))
+    per_type = {'CONTACT_PHONE': counts.get('phone', 0), 'CONTACT_EMAIL': counts.get('email', 0),
+                'CONTACT_SOCIAL': counts.get('social', 0)}
+    for category, _ in keywords:
+        per_type[category] = per_type.get(category, 0) + 1
+    signals = []
+    for signal_type, n in per_type.items():
+        if not n:
+            continue
+        confidence = 0.5 if n == 1 else 0.7 if n == 2 else 0.85
+        if signal_type == 'GROOMING_LANGUAGE':
+            confidence *= 0.8
+        elif flags:
+            confidence = min(1.0, confidence + obf * 0.3)
+        signals.append({'signal_type': signal_type, 'confidence': round(confidence, 3),
+                        'obfuscation_flags': [] if signal_type == 'GROOMING_LANGUAGE' else flags, 'pattern_flags': []})
+    return signals
+
+
+def paginate(rows, query, **filters):
+    rows = [r for r in rows if all(str(r.get(k)) == v for k, v in filters.items() if v is not None)]
+    page = max(1, int(query.get('page', 1) or 1))
+    limit = max(1, min(100, int(query.get('limit', 20) or 20)))
+    total = len(rows)
+    return {'data': rows[(page - 1) * limit:page * limit],
+            'pagination': {'page': page, 'limit': limit, 'total': total, 'pages': -(-total // limit)}}
+
+
+class StubAPI:
+    """Routes and in-memory state; every handler returns (status, json-able body)."""
+
+    def __init__(self, tables=None, rate_limit=0, rate_window=60):
+        self.tables = tables or seed()
+        self.rate_limit, self.rate_window = rate_limit, rate_window
+        self.rate_counts = {}  # client -> [count, window reset time], like rateLimit.ts's store
+        self.tables.setdefault('evaluation_log', [])
+        self.lock = threading.Lock()
+        self.subscribers = set()
+        self.webhook_keys = {}  # (source, idempotency_key) -> row, standing in for uq_webhook_idempotency
+        self.processed = set()  # event ids, standing in for processed_events
+        self.cache = {}  # key -> (value, expires at), cache/index.ts's in-memory fallback
+        self.cache_stats = {'hits': 0, 'misses': 0}
+        self.started = time.time()
+        self.routes = [
+            ('POST', r'/api/auth/login', self.login, False),
+            ('GET', r'/api/auth/me', self.me, True),
+            ('GET', r'/api/health', self.health, False),
+            ('GET', r'/api/ready', self.ready, False),
+            ('GET', r'/api/alerts', self.list_alerts, True),
+            ('GET', r'/api/alerts/(?P<id>[^/]+)', self.get_row('alerts', 'Alert'), True),
+            ('GET', r'/api/cases', self.list_table('cases', 'status', 'user_id'), True),
+            ('GET', r'/api/cases/(?P<id>[^/]+)', self.get_case, True),
+            ('POST', r'/api/cases/(?P<id>[^/]+)/notes', self.add_note, True),
+            ('GET', r'/api/enforcement-actions', self.list_table('enforcement_actions', 'user_id', 'action_type'), True),
+            ('GET', r'/api/risk-scores', self.list_table('risk_scores', 'tier', 'user_id'), True),
+            ('GET', r'/api/risk-scores/user/(?P<id>[^/]+)', self.user_score, True),
+            ('GET', r'/api/risk-signals', self.list_table('risk_signals', 'user_id', 'signal_type'), True),
+            ('GET', r'/api/appeals', self.list_table('appeals', 'status'), True),
+            ('GET', r'/api/audit-logs', self.list_table('audit_logs', 'action', 'entity_type'), True),
+            ('GET', r'/api/users', self.list_table('users', 'status', 'user_type'), True),
+            ('GET', r'/api/users/(?P<id>[^/]+)', self.get_row('users', 'User'), True),
+            ('GET', r'/api/shadow/status', self.shadow_status, True),
+            ('GET', r'/api/stats/v2/(?P<report>[a-z-]+)', self.stats_v2, True),
+            ('POST', r'/api/events', self.ingest_event, True),
+            ('POST', r'/api/webhooks/ingest', self.ingest_webhook, False),
+            ('POST', r'/api/evaluate', self.evaluate, False),
+            ('POST', r'/api/analyze-event', self.analyze_event, False),
+            ('GET', r'/api/stream', self.stream, False),
+        ]
+        self.routes = [(m, re.compile(p + '$'), fn, auth) for m, p, fn, auth in self.routes]
+
+    def throttle(self, client, path):
+        """globalLimiter from rateLimit.ts when rate_limit is set: (X-RateLimit-*/Retry-After headers, rejected)."""
+        if not self.rate_limit or not path.startswith('/api') or path.startswith('/api/health'):
+            return {}, False
+        now = time.time()
+        with self.lock:
+            entry = self.rate_counts.get(client)
+            if entry is None or now > entry[1]:
+                entry = self.rate_counts[client] = [0, now + self.rate_window]
+            entry[0] += 1
+            count, reset = entry
+        reset_sec = max(0, -int(-(reset - now) // 1))
+        headers = {'X-RateLimit-Limit': str(self.rate_limit), 'X-RateLimit-Remaining': str(max(0, self.rate_limit - count)),
+                   'X-RateLimit-Reset': str(reset_sec)}
+        if count <= self.rate_limit:
+            return headers, False
+        return dict(headers, **{'Retry-After': str(reset_sec)}), True
+
+    def dispatch(self, method, path, headers, body):
+        u = urlsplit(path)
+        query = {k: v[-1] for k, v in parse_qs(u.query).items()}
+        if method == 'GET' and u.path == '/':
+            return 200, 'text/html', b'<!DOCTYPE html><html><head><title>QwickServices CIS</title></head><body></body></html>'
+        if method == 'GET' and u.path.startswith('/_next/static/css/'):
+            return 200, 'text/css', b'body{margin:0}'
+        for m, pattern, fn, auth in self.routes:
+            match = pattern.match(u.path)
+            if not match or m != method:
+                continue
+            claims = None
+            if auth:
+                bearer = headers.get('Authorization', '')
+                claims = verify_jwt(bearer[7:]) if bearer.startswith('Bearer ') else None
+                if claims is None:
+                    return 401, None, {'error': 'Invalid or expired token'}
+            try:
+                data = json.loads(body) if body else {}
+            except ValueError:
+                return 400, None, {'error': 'Invalid JSON'}
+            return fn(dict(match.groupdict(), query=query, body=data, claims=claims, headers=headers))
+        return 404, None, {'error': 'Not found'}
+
+    def login(self, req):
+        email, password = req['body'].get('email', ''), req['body'].get('password', '')
+        if '@' not in email or len(password) < 8:
+            return 400, None, {'error': 'Validation failed'}
+        if email != ADMIN['email'] or password != ADMIN['password']:
+            return 401, None, {'error': 'Invalid credentials'}
+        now = int(time.time())
+        user = {'id': ADMIN['id'], 'email': ADMIN['email'], 'role': ADMIN['role'], 'permissions': PERMISSIONS}
+        token = make_jwt(dict(user, iat=now, exp=now + JWT_TTL))
+        return 200, None, {'token': token, 'user': dict(user, name=ADMIN['name'], force_password_change=False)}
+
+    def me(self, req):
+        c = req['claims']
+        return 200, None, {'user': {k: c[k] for k in ('id', 'email', 'role', 'permissions')}}
+
+    def health(self, req):
+        return 200, None, {'status': 'healthy', 'timestamp': datetime.now(timezone.utc).isoformat(), 'version': '2.0.0',
+                           'uptime': int(time.time() - self.started), 'environment': 'stub', 'shadowMode': True,
+                           'enforcementKillSwitch': False, 'database': 'connected',
+                           'checks': {'database': 'connected', 'event_bus': 'memory'}}
+
+    def ready(self, req):
+        return 200, None, {'ready': True, 'timestamp': datetime.now(timezone.utc).isoformat(),
+                           'checks': {'database': {'ok': True, 'latency_ms': 0},
+                                      'pool': {'ok': True, 'detail': 'total=1 idle=1 waiting=0'},
+                                      'cache': {'ok': True, 'detail': 'hits={hits} misses={misses} size={size}'.format(
+                                          size=len(self.cache), **self.cache_stats)}}}
+
+    def cache_get(self, key):
+        """cacheGet: the value, or None when it is absent or expired; every call counts as a hit or a miss."""
+        with self.lock:
+            value, expires = self.cache.get(key, (None, 0))
+            if value is not None and expires < time.time():
+                del self.cache[key]
+                value = None
+            self.cache_stats['hits' if value is not None else 'misses'] += 1
+        return value
+
+    def cache_set(self, key, value, ttl):
+        with self.lock:
+            self.cache[key] = (value, time.time() + ttl)
+
+    def list_table(self, table, *filters):
+        def handler(req):
+            with self.lock:
+                rows = list(self.tables[table])
+            return 200, None, paginate(rows, req['query'], **{f: req['query'].get(f) for f in filters})
+        return handler
+
+    def get_row(self, table, label):
+        def handler(req):
+            with self.lock:
+                row = next((r for r in self.tables[table] if r['id'] == req['id']), None)
+            return (200, None, {'data': row}) if row else (404, None, {'error': f'{label} not found'})
+        return handler
+
+    def list_alerts(self, req):
+        order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+        with self.lock:
+            rows = sorted(self.tables['alerts'], key=lambda a: a['created_at'], reverse=True)
+        rows.sort(key=lambda a: order[a['priority']])
+        q = req['query']
+        return 200, None, paginate(rows, q, status=q.get('status'), priority=q.get('priority'))
+
+    def get_case(self, req):
+        with self.lock:
+            case = next((c for c in self.tables['cases'] if c['id'] == req['id']), None)
+            notes = sorted((n for n in self.tables['case_notes'] if n['case_id'] == req['id']), key=lambda n: n['created_at'])
+        if case is None:
+            return 404, None, {'error': 'Case not found'}
+        return 200, None, {'data': dict(case, notes=notes)}
+
+    def add_note(self, req):
+        content = req['body'].get('content')
+        if not isinstance(content, str) or not content:
+            return 400, None, {'error': 'Validation failed'}
+        note = {'id': str(uuid.uuid4()), 'case_id': req['id'], 'author': req['claims']['email'], 'content': content,
+                'created_at': datetime.now(timezone.utc).isoformat()}
+        with self.lock:
+            if not any(c['id'] == req['id'] for c in self.tables['cases']):
+                return 500, None, {'error': 'Internal server error'}
+            self.tables['case_notes'].append(note)
+        return 201, None, {'data': note}
+
+    def user_score(self, req):
+        with self.lock:
+            row = next((r for r in self.tables['risk_scores'] if r['user_id'] == req['id']), None)
+        return (200, None, {'data': row}) if row else (404, None, {'error': 'No risk score found for user'})
+
+    def shadow_status(self, req):
+        with self.lock:
+            signals = len(self.tables['risk_signals'])
+            actions = sum(1 for e in self.tables['enforcement_actions'] if e['metadata'].get('shadow_mode') == 'true')
+            tiers = {}
+            for r in self.tables['risk_scores']:
+                tiers[r['tier']] = tiers.get(r['tier'], 0) + 1
+        return 200, None, {'shadow_mode': True, 'enforcement_kill_switch': False,
+                           'metrics': {'total_signals': signals, 'shadow_actions': actions, 'signals_last_24h': signals,
+                                       'tier_distribution': [{'tier': t, 'count': str(n)} for t, n in tiers.items()],
+                                       'dead_letter_queue_size': 0, 'registered_consumers': []}}
+
+    def stats_v2(self, req):
+        """The stats-v2 analytics reports, bucketed from the seeded signals, alerts and enforcement actions.
+
+        The stub has no messages, transactions or bookings, so those series are empty; like the
+        backend it computes every report from scratch on each call.
+        """
+        if 'intelligence.view' not in req['claims'].get('permissions', []):
+            return 403, None, {'error': 'Insufficient permissions'}
+        q = req['query']
+        span = STATS_RANGES.get(q.get('range'), STATS_RANGES['last_24h'])
+        step = STATS_BUCKETS.get(q.get('granularity'), STATS_BUCKETS['hourly'])
+        now = time.time()
+        with self.lock:
+            signals = list(self.tables['risk_signals'])
+            alerts = list(self.tables['alerts'])
+            actions = list(self.tables['enforcement_actions'])
+
+        def series(rows, key='created_at', window=span):
+            counts = {}
+            for r in rows:
+                at = datetime.fromisoformat(r[key]).timestamp()
+                if now - at < window:
+                    bucket = datetime.fromtimestamp(at - at % step, timezone.utc).isoformat()
+                    counts[bucket] = counts.get(bucket, 0) + 1
+            return [{'ts': ts, 'count': n} for ts, n in sorted(counts.items())]
+
+        def kpi(current, previous):
+            return {'value': current, 'previous': previous, 'sparkline': [], 'status': 'green'}
+
+        report = req['report']
+        in_range = lambda rows: [r for r in rows if now - datetime.fromisoformat(r['created_at']).timestamp() < span]
+        if report == 'kpi':
+            off = [r for r in signals if r['signal_type'] in ('OFF_PLATFORM_INTENT', 'PAYMENT_EXTERNAL')]
+            opened = [a for a in alerts if a['status'] in ('open', 'assigned', 'in_progress')]
+            providers = sum(1 for u in self.tables['users'] if u['user_type'] == 'provider' and u['status'] == 'active')
+            data = {'active_users': kpi(0, 0), 'active_providers': kpi(providers, providers), 'messages_sent': kpi(0, 0),
+                    'transactions_completed': kpi(0, 0), 'failed_transactions': kpi(0, 0),
+                    'off_platform_signals': kpi(len(in_range(off)), len(off) - len(in_range(off))),
+                    'open_alerts': kpi(len(in_range(opened)), len(opened) - len(in_range(opened))),
+                    'trust_score_index': kpi(0, 0)}
+        elif report == 'timeline':
+            data = [{'ts': p['ts'], 'messages': 0, 'transactions': 0, 'risk_signals': p['count'], 'enforcements': 0}
+                    for p in series(signals)]
+        elif report == 'signal-breakdown':
+            types = {}
+            for r in in_range(signals):
+                types[r['signal_type']] = types.get(r['signal_type'], 0) + 1
+            data = {'domains': [{'signal_type': t, 'count': n} for t, n in sorted(types.items())],
+                    'timeSeries': series(signals)}
+        elif report == 'evaluation-stats':
+            kinds = {}
+            for a in in_range(actions):
+                kinds[a['action_type']] = kinds.get(a['action_type'], 0) + 1
+            data = {'decision_time_series': series(actions),
+                    'by_action_type': [{'action_type': k, 'count': n} for k, n in sorted(kinds.items())],
+                    'latency': {'p50': 0, 'p95': 0, 'p99': 0}}
+        elif report == 'alert-stats':
+            rows = in_range(alerts)
+            by = lambda field: [{field: v, 'count': sum(1 for a in rows if a[field] == v)}
+                                for v in sorted({a[field] for a in rows})]
+            resolved = sum(1 for a in rows if a['status'] in ('resolved', 'dismissed'))
+            data = {'by_source': [{'source': 'detection', 'count': len(rows)}], 'by_priority': by('priority'),
+                    'open_count': len(rows) - resolved, 'resolved_count': resolved, 'total': len(rows),
+                    'avg_resolution_hours': 0, 'sla_breach_count': 0, 'sla_breach_rate': 0}
+        elif report == 'booking-timeline':
+            data = {'kpi': {k: kpi(0, 0) for k in ('total_bookings', 'completed', 'cancelled', 'no_shows')},
+                    'timeline': [], 'by_category': []}
+        elif report == 'financial-flow':
+            data = {'kpi': {'total_volume': 0, 'avg_transaction': 0, 'total_transactions': 0},
+                    'wallet_timeline': [], 'transaction_timeline': []}
+        elif report == 'leakage-funnel':
+            data = {'funnel': [], 'destinations': [], 'revenue': {}, 'velocity': series(signals)}
+        else:
+            return 404, None, {'error': 'Not found'}
+        return 200, None, {'data': data}
+
+    def ingest_event(self, req):
+        body = req['body']
+        if body.get('type') not in EVENT_TYPES or not isinstance(body.get('payload'), dict):
+            return 400, None, {'error': 'Validation failed'}
+        event = {'id': body.get('id') or str(uuid.uuid4()), 'type': body['type'],
+                 'correlation_id': body.get('correlation_id') or str(uuid.uuid4()),
+                 'timestamp': body.get('timestamp') or datetime.now(timezone.utc).isoformat(),
+                 'version': body.get('version', 1), 'payload': body['payload']}
+        self.emit(event)
+        return 202, None, {'accepted': True, 'event_id': event['id'], 'correlation_id': event['correlation_id']}
+
+    def ingest_webhook(self, req):
+        """Like routes/webhooks.ts: HMAC over the re-serialized body, then idempotency on (source, event_id)."""
+        body = req['body']
+        source = body.get('source', 'qwickservices')
+        if not (isinstance(body.get('event_id'), str) and len(body['event_id']) <= 255
+                and isinstance(body.get('event_type'), str) and len(body['event_type']) <= 100
+                and ISO_UTC.match(str(body.get('timestamp', ''))) and source == 'qwickservices'
+                and isinstance(body.get('payload'), dict)):
+            return 400, None, {'error': 'Validation failed'}
+        signature = req['headers'].get('X-Webhook-Signature')
+        if not signature:
+            return 401, None, {'error': 'Missing X-Webhook-Signature header'}
+        signed = json.dumps(body, separators=(',', ':'), ensure_ascii=False).encode()
+        expected = hmac.new(WEBHOOK_SECRET.encode(), signed, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(signature, expected):
+            return 401, None, {'error': 'Invalid webhook signature'}
+        row = {'id': str(uuid.uuid4()), 'external_event_id': body['event_id'], 'source': source,
+               'event_type': body['event_type'], 'payload': body['payload'], 'idempotency_key': body['event_id'],
+               'status': 'received', 'attempts': 0, 'received_at': datetime.now(timezone.utc).isoformat()}
+        with self.lock:
+            existing = self.webhook_keys.setdefault((source, body['event_id']), row)
+            if existing is row:
+                self.tables['webhook_events'].append(row)
+                existing = None
+        if existing is not None:
+            return 200, None, {'received': True, 'event_id': existing['id'], 'duplicate': True}
+        event_type = WEBHOOK_EVENTS.get(body['event_type'])
+        row['attempts'] = 1
+        if event_type is None:
+            row['status'] = 'failed'
+            return 400, None, {'error': f'Unknown webhook event type: {body["event_type"]}'}
+        self.emit({'id': str(uuid.uuid4()), 'type': event_type, 'correlation_id': str(uuid.uuid4()),
+                   'timestamp': body['timestamp'], 'version': 1, 'payload': self.normalize(event_type, body['payload'])})
+        row['status'] = 'processed'
+        return 202, None, {'received': True, 'event_id': row['id']}
+
+    def service_auth(self, req):
+        """verifyHMAC over "timestamp.body" or an admin JWT; returns the error response, or None if allowed."""
+        headers = req['headers']
+        sig, ts = headers.get('X-HMAC-Signature'), headers.get('X-HMAC-Timestamp')
+        if sig and ts:
+            if not ts.isdigit() or abs(time.time() * 1000 - int(ts)) > 5 * 60 * 1000:
+                return 401, None, {'error': 'Request timestamp too old'}
+            signed = f'{ts}.{json.dumps(req["body"], separators=(",", ":"), ensure_ascii=False)}'.encode()
+            if not hmac.compare_digest(sig, hmac.new(HMAC_SECRET.encode(), signed, hashlib.sha256).hexdigest()):
+                return 401, None, {'error': 'Invalid HMAC signature'}
+        elif headers.get('Authorization', '').startswith('Bearer '):
+            if verify_jwt(headers['Authorization'][7:]) is None:
+                return 401, None, {'error': 'Invalid or expired token'}
+        else:
+            return 401, None, {'error': 'Missing authentication (HMAC or JWT required)'}
+        return None
+
+    def analyze_event(self, req):
+        """Like routes/analyze.ts: run detection on a message event; signals of unknown senders fail the FK."""
+        body = req['body']
+        denied = self.service_auth(req)
+        if denied:
+            return denied
+        if body.get('type') not in EVENT_TYPES or not isinstance(body.get('payload'), dict) \
+                or ('id' in body and not UUID.match(str(body['id']))):
+            return 400, None, {'error': 'Validation failed'}
+        started = time.perf_counter()
+        event_id, payload = body.get('id') or str(uuid.uuid4()), body['payload']
+        content = payload.get('content')
+        signals = []
+        if body['type'] in ('message.created', 'message.edited') and isinstance(content, str) and content \
+                and payload.get('sender_id') and payload.get('receiver_id'):
+            evidence = {'message_ids': [payload.get('message_id') or event_id],
+                        'timestamps': [body.get('timestamp') or datetime.now(timezone.utc).isoformat()]}
+            signals = [dict(s, evidence=evidence) for s in detect(content)]
+            with self.lock:
+                if any(u['id'] == payload['sender_id'] for u in self.tables['users']):
+                    created = datetime.now(timezone.utc).isoformat()
+                    self.tables['risk_signals'][:0] = [
+                        dict(s, id=str(uuid.uuid4()), source_event_id=event_id, user_id=payload['sender_id'],
+                             confidence=f'{s["confidence"]:.3f}', created_at=created) for s in signals]
+        return 200, None, {'event_id': event_id, 'signals': signals, 'signal_count': len(signals),
+                           'processing_time_ms': int((time.perf_counter() - started) * 1000)}
+
+    def evaluate(self, req):
+        """Like routes/evaluate.ts in shadow mode: HMAC or JWT auth, then allow with the latest score."""
+        body = req['body']
+        denied = self.service_auth(req)
+        if denied:
+            return denied
+        if (body.get('action_type') not in ('booking.create', 'payment.initiate', 'provider.register')
+                or not UUID.match(str(body.get('user_id', '')))
+                or ('counterparty_id' in body and not UUID.match(str(body['counterparty_id'])))
+                or not isinstance(body.get('metadata', {}), dict)):
+            return 400, None, {'error': 'Validation error'}
+        started = time.perf_counter()
+        # The latest score is read through the eval:<user> cache entry (30s), the signals are not
+        row = self.cache_get(f'eval:{body["user_id"]}')
+        with self.lock:
+            if row is None:
+                scores = [r for r in self.tables['risk_scores'] if r['user_id'] == body['user_id']]
+                row = max(scores, key=lambda r: r['created_at']) if scores else None
+            signals = [r['signal_type'] for r in self.tables['risk_signals'] if r['user_id'] == body['user_id']][:20]
+        if row is not None:
+            self.cache_set(f'eval:{body["user_id"]}', row, 30)
+        if row is None:
+            score, tier, reason, signals = 0, 'monitor', 'No risk score on file', []
+        else:
+            score, tier = float(row['score']), row['tier']
+            reason = ('Risk score within acceptable range' if score < 40
+                      else f'[SHADOW] Would flag: risk score {score} in medium range' if score < 70
+                      else f'[SHADOW] Would block: risk score {score} exceeds threshold')
+        elapsed = int((time.perf_counter() - started) * 1000)
+        with self.lock:
+            self.tables['evaluation_log'].append({'id': str(uuid.uuid4()), 'user_id': body['user_id'],
+                                                  'action_type': body['action_type'], 'decision': 'allow',
+                                                  'risk_score': score, 'evaluation_time_ms': elapsed})
+        result = {'decision': 'allow', 'risk_score': score, 'risk_tier': tier, 'reason': reason, 'signals': signals,
+                  'evaluation_time_ms': elapsed}
+        if row is not None:
+            result['enforcement_id'] = None
+        return 200, None, result
+
+    def normalize(self, event_type, raw):
+        """normalizer.ts's payload mapping, reduced to what it does to user ids: every non-UUID id
+        of a booking, wallet, provider, dispute, refund or profile event is resolved by external_id,
+        creating the CIS user on first sight (resolveOrCreateUser)."""
+        fields = {'booking.': (('client_id', 'customer_id', 'client_id'), ('provider_id', 'provider_id', 'seller_id')),
+                  'wallet.': (('user_id', 'user_id', 'customer_id'), ('counterparty_id', 'counterparty_id')),
+                  'provider.': (('user_id', 'user_id', 'provider_id', 'id'),),
+                  'dispute.': (('complainant_id', 'complainant_id', 'user_id', 'client_id'),
+                               ('respondent_id', 'respondent_id', 'provider_id')),
+                  'refund.': (('user_id', 'user_id', 'customer_id'),),
+                  'user.profile_updated': (('user_id', 'user_id', 'id'),)}
+        spec = next((f for prefix, f in fields.items() if event_type.startswith(prefix)), ())
+        payload = dict(raw)
+        for target, *sources in spec:
+            value = next((str(raw[k]) for k in sources if raw.get(k)), '')
+            if value:
+                payload[target] = value if UUID.match(value) else self.resolve_user(value)
+        return payload
+
+    def resolve_user(self, external_id):
+        with self.lock:
+            user = next((u for u in self.tables['users'] if u.get('external_id') == external_id), None)
+            if user is None:
+                now = datetime.now(timezone.utc).isoformat()
+                user = {'id': str(uuid.uuid4()), 'external_id': external_id, 'display_name': None, 'email': None,
+                        'phone': None, 'user_type': None, 'service_category': None, 'trust_score': '50.00',
+                        'status': 'active', 'verification_status': 'unverified', 'created_at': now}
+                self.tables['users'].insert(0, user)
+        return user['id']
+
+    def emit(self, event):
+        """EventBus.emit from events/bus.ts: skip processed ids, write the event.<type> audit row, run
+        detection on messages (the signals of unknown senders fail the FK), then notify subscribers."""
+        payload = event['payload']
+        content = payload.get('content')
+        signals = []
+        if event['type'] in ('message.created', 'message.edited') and isinstance(content, str) and content \
+                and payload.get('sender_id') and payload.get('receiver_id'):
+            evidence = {'message_ids': [payload.get('message_id') or event['id']], 'timestamps': [event['timestamp']]}
+            signals = [dict(s, evidence=evidence) for s in detect(content)]
+        now = datetime.now(timezone.utc).isoformat()
+        with self.lock:
+            if event['id'] in self.processed:
+                return
+            self.processed.add(event['id'])
+            self.tables['audit_logs'].insert(0, {
+                'id': str(uuid.uuid4()), 'actor': 'system', 'actor_type': 'event_bus', 'action': f'event.{event["type"]}',
+                'entity_type': 'event', 'entity_id': event['id'], 'timestamp': now,
+                'details': {'correlation_id': event['correlation_id'], 'event_type': event['type'],
+                            'payload_keys': list(payload)}})
+            if signals and any(u['id'] == payload['sender_id'] for u in self.tables['users']):
+                self.tables['risk_signals'][:0] = [
+                    dict(s, id=str(uuid.uuid4()), source_event_id=event['id'], user_id=payload['sender_id'],
+                         confidence=f'{s["confidence"]:.3f}', created_at=now) for s in signals]
+        self.publish(event)
+
+    def publish(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for q in subscribers:
+            q.put(event)
+
+    def stream(self, req):
+        """SSE bridge like routes/stream.ts: ?token= auth, optional ?events= type filter."""
+        claims = verify_jwt(req['query'].get('token', ''))
+        if claims is None:
+            return 401, None, {'error': 'Invalid or expired token'}
+        wanted = req['query'].get('events')
+        wanted = {t.strip() for t in wanted.split(',')} if wanted else None
+        return 200, 'text/event-stream', self._events(wanted)
+
+    def _events(self, wanted):
+        q = queue.Queue()
+        with self.lock:
+            self.subscribers.add(q)
+        try:
+            yield f'data: {json.dumps({"type": "connected", "timestamp": datetime.now(timezone.utc).isoformat()})}\n\n'
+            while True:
+                try:
+                    event = q.get(timeout=1)
+                except queue.Empty:
+                    yield ': heartbeat\n\n'
+                    continue
+                if wanted and event['type'] not in wanted:
+                    continue
+                data = {k: event[k] for k in ('id', 'type', 'timestamp', 'correlation_id', 'payload')}
+                yield f'event: {event["type"]}\ndata: {json.dumps(data)}\n\n'
+        finally:
+            with self.lock:
+                self.subscribers.discard(q)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    api = None
+
+    def handle_any(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        extra, rejected = self.api.throttle(self.client_address[0], self.path)
+        if rejected:
+            status, ctype, payload = 429, None, {'error': 'Too many requests',
+                                                 'retryAfterSeconds': int(extra['Retry-After'])}
+        else:
+            status, ctype, payload = self.api.dispatch(self.command, self.path, self.headers, body)
+        if ctype == 'text/event-stream':
+            return self.stream(payload)
+        etag = None
+        if not isinstance(payload, bytes):
+            ctype, payload = 'application/json; charset=utf-8', json.dumps(payload).encode()
+            if self.command == 'GET' and status == 200:
+                # Express's default weak ETag on res.json, and the If-None-Match half of req.fresh
+                etag = f'W/"{len(payload):x}-{base64.b64encode(hashlib.sha1(payload).digest()).decode()[:27]}"'
+                if etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(',')]:
+                    status, payload = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', ctype)
+        for name, value in extra.items():
+            self.send_header(name, value)
+        if etag:
+            self.send_header('ETag', etag)
+        if status != 304:
+            self.send_header('Content-Length', str(len(payload)))
+        try:
+            self.end_headers()
+            self.wfile.write(payload)
+        except OSError:
+            self.close_connection = True  # the client gave up (a harness timeout or deadline)
+
+    def stream(self, chunks):
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        try:
+            for chunk in chunks:
+                self.wfile.write(chunk.encode())
+                self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            chunks.close()
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = handle_any
+
+    def log_message(self, *args):
+        pass
+
+
+def start(host='127.0.0.1', port=0, api=None):
+    """Serves on a background thread; returns (server, base_url). Port 0 picks a free port."""
+    handler = type('StubHandler', (Handler,), {'api': api or StubAPI()})
+    server = type('StubServer', (ThreadingHTTPServer,), {'request_queue_size': 256})((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local stand-in CIS API for the dashboard suite')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--rate-limit', type=int, default=0,
+                        help='requests per client per --rate-window, like RATE_LIMIT_MAX (default: off)')
+    parser.add_argument('--rate-window', type=float, default=60, help='rate limit window in seconds')
+    args = parser.parse_args(argv)
+    server, url = start(args.host, args.port, StubAPI(rate_limit=args.rate_limit, rate_window=args.rate_window))
+    print(f'CIS stub API listening on {url}', flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+"""Population-wide sweep of the per-user risk score lookup.
+
+GET /api/risk-scores/user/:id reads the user's latest risk_scores row, and that row's
+signal_count is how many signals aggregator-v2 folded into it. With idx_risk_scores_user_latest
+in place the lookup is one index probe, so its latency should not depend on the user. Latency
+that grows with signal_count points to a scan over the user's history. A user who is slow with
+few signals points to a plan that has lost the index.
+"""
+import math
+
+from cis_runner import summarize
+
+CHUNK = 500  # users fetched per fan-out, so a large population is never held in flight at once
+
+
+def bucket_of(signals):
+    """'0', '1', '2-3', '4-7', ... -- power-of-two buckets of a signal count."""
+    if signals < 2:
+        return str(signals)
+    lo = 1 << (signals.bit_length() - 1)
+    return f'{lo}-{2 * lo - 1}'
+
+
+def by_bucket(points):
+    """[(bucket, latency summary)] in signal-count order for the scored points.
+
+    Each point is a dict with 'status', 'signals' (None when unknown) and 'seconds'.
+    """
+    groups = {}
+    for p in points:
+        if p['status'] == 200 and p['signals'] is not None:
+            groups.setdefault(p['signals'].bit_length(), []).append(p['seconds'])
+    return [(bucket_of(0 if k == 0 else 1 << (k - 1)), summarize(v)) for k, v in sorted(groups.items())]
+
+
+def slope(points):
+    """Least-squares ms per signal and Pearson r over the scored points, or (None, None) with too few."""
+    xy = [(p['signals'], p['seconds'] * 1000) for p in points if p['status'] == 200 and p['signals'] is not None]
+    if len(xy) < 3:
+        return None, None
+    mx = sum(x for x, _ in xy) / len(xy)
+    my = sum(y for _, y in xy) / len(xy)
+    sxx = sum((x - mx) ** 2 for x, _ in xy)
+    syy = sum((y - my) ** 2 for _, y in xy)
+    if sxx == 0:
+        return None, None
+    sxy = sum((x - mx) * (y - my) for x, y in xy)
+    return sxy / sxx, sxy / math.sqrt(sxx * syy) if syy else 0.0
+
+
+def classify_sweep(buckets, growth=1.5, min_excess_ms=5.0, min_users=3):
+    """'flat' or 'GROWS WITH SIGNALS', comparing p50 of the lowest and highest bucket with `min_users`."""
+    full = [(name, stats) for name, stats in buckets if stats['n'] >= min_users]
+    if len(full) < 2:
+        return 'flat'
+    first, last = full[0][1]['p50'], full[-1][1]['p50']
+    if last - first < min_excess_ms or last <= first * growth:
+        return 'flat'
+    return 'GROWS WITH SIGNALS'
+
+
+def slow_threshold(points, factor=5.0, floor_ms=25.0):
+    """Latency in ms above which a lookup is flagged: `factor` x the sweep's p50, at least `floor_ms`."""
+    p50 = summarize([p['seconds'] for p in points if p['status'] in (200, 404)])['p50']
+    return max(floor_ms, factor * p50)
+
+
+def slow_users(points, threshold_ms):
+    """The points slower than `threshold_ms`, slowest first."""
+    return sorted((p for p in points if p['seconds'] * 1000 > threshold_ms), key=lambda p: -p['seconds'])
@@ -0,0 +1,76 @@
+"""Bytes-on-the-wire and revalidation audit of read endpoints.
+
+Each endpoint is fetched once with `Accept-Encoding: identity` and once with `gzip, br`, so the
+report can compare the raw payload with what the server actually sends. It also shows what
+gzip at level 6 would send. The validators the server returned (ETag, Last-Modified) are then
+replayed as If-None-Match / If-Modified-Since; an endpoint that answers 304 costs a repeat
+reader headers only.
+"""
+import gzip, zlib
+
+OFFERED = 'gzip, br'
+
+
+def decoded_size(encoding, data):
+    """Length of the decoded body, or None when stdlib cannot decode it (br) or it is corrupt."""
+    try:
+        if encoding in ('gzip', 'x-gzip'):
+            return len(gzip.decompress(data))
+        if encoding == 'deflate':
+            return len(zlib.decompress(data))
+    except (OSError, EOFError, zlib.error):
+        return None
+    return len(data) if encoding == 'identity' else None
+
+
+def revalidate(request, path, header, value):
+    """(conditional status, whether the validator changed on a 200) for one validator."""
+    status, headers, _ = request(path, {header: value})
+    if status != 200:
+        return status, False
+    key = 'etag' if header == 'If-None-Match' else 'last-modified'
+    return status, headers.get(key) != value
+
+
+def audit(request, path):
+    """Audit one endpoint; request(path, headers) returns (status, lower-cased headers, body bytes)."""
+    status, headers, raw = request(path, {'Accept-Encoding': 'identity'})
+    out = {'path': path, 'status': status, 'raw': len(raw), 'etag': headers.get('etag'),
+           'last_modified': headers.get('last-modified'), 'cache_control': headers.get('cache-control'),
+           'vary': headers.get('vary')}
+    if status != 200:
+        return out
+    status, headers, wire = request(path, {'Accept-Encoding': OFFERED})
+    encoding = headers.get('content-encoding', 'identity').strip().lower()
+    out.update(wire=len(wire), encoding=encoding, gzip6=len(gzip.compress(raw, 6)),
+               decoded=decoded_size(encoding, wire), compressed_status=status)
+    for field, header in (('etag', 'If-None-Match'), ('last_modified', 'If-Modified-Since')):
+        if out[field]:
+            out[field + '_status'], out[field + '_unstable'] = revalidate(request, path, header, out[field])
+    return out
+
+
+def revalidates(row):
+    return row.get('etag_status') == 304 or row.get('last_modified_status') == 304
+
+
+def findings(rows, min_bytes=1024):
+    """[(path, message)] for uncompressed payloads of at least `min_bytes` and endpoints without 304s."""
+    out = []
+    for r in rows:
+        if r['status'] != 200:
+            out.append((r['path'], f'HTTP {r["status"]}'))
+            continue
+        if r['encoding'] == 'identity' and r['raw'] >= min_bytes:
+            out.append((r['path'], f'{r["raw"]} bytes sent uncompressed (gzip would send {r["gzip6"]})'))
+        elif r['encoding'] != 'identity' and r['decoded'] is not None and r['decoded'] != r['raw']:
+            out.append((r['path'], f'{r["encoding"]} body decodes to {r["decoded"]} bytes, identity has {r["raw"]}'))
+        if not revalidates(r):
+            if r.get('etag_unstable') or r.get('last_modified_unstable'):
+                why = 'validator changes on every request'
+            elif r['etag'] or r['last_modified']:
+                why = 'validator ignored'
+            else:
+                why = 'no ETag or Last-Modified'
+            out.append((r['path'], f'no 304 revalidation ({why})'))
+    return out
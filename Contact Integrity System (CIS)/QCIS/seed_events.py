@@ -0,0 +1,363 @@
+"""Bulk synthetic data seeder that drives the CIS event pipeline at volume.
+
+seed-test-data.sql holds a handful of rows, so the dashboard suite never sees realistic
+table sizes. This driver generates providers, clients, and then chat messages, bookings and
+transactions between them from a seeded RNG, and pushes them through the same path the
+marketplace uses. Every event goes through EventBus.emit: an event.<type> audit row, detection on
+messages, then scoring and alerting. Requests go out in batches of --batch on one connection
+with HTTP/1.1 pipelining, and --parallel connections run at once.
+
+The user.registered consumer does not create user rows, so users are registered through
+/api/webhooks/ingest. There, normalizer.ts creates a CIS user for every unknown external id:
+- A provider-register event registers each provider.
+- Each client's first booking-create registers the client.
+The seeder then resolves the external ids with /api/users. Messages, bookings and transactions
+go to POST /api/events with CIS ids. A --contact-rate share of the messages shares a phone
+number or email address, so detection has something to find.
+
+Progress is checkpointed to --state about once a second. Rerunning with the same state file
+resumes, and only unfinished batches are sent. Batches are generated deterministically from
+(seed, run tag, batch number), so a batch re-sent after a crash carries the same event ids and
+webhook event_ids. The bus and the webhook idempotency key then skip what was already processed.
+The state file also records table totals from before the first batch. test_dashboard.py
+--scale FILE asserts against those totals plus what was seeded.
+
+The global limiter allows RATE_LIMIT_MAX (100) requests a minute. Raise it on the target
+before seeding at volume; throttled requests are retried after their Retry-After.
+
+    python seed_events.py --providers 500 --clients 5000 --messages 50000 --bookings 10000 --transactions 10000
+    python seed_events.py --state seed-state.json        # resume an interrupted run
+    python seed_events.py --stub --messages 2000         # in-process stub; always a new run
+"""
+import argparse, collections, json, os, random, sys, tempfile, threading, time, uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import test_dashboard as td
+from bench_analyze import message
+from bench_evaluate import SERVICES, PAYMENT_METHODS
+from bench_webhooks import INGEST, sign
+from cis_load import retry_after
+from cis_paging import PageWalker, read_pagination
+from cis_runner import summarize
+
+EVENTS = '/api/events'
+STATE_FILE = 'seed-state.json'
+# Tables whose totals the scale profile compares against, keyed as in the state file's 'before'
+TOTALS = {'users': '/api/users', 'alerts': '/api/alerts', 'cases': '/api/cases',
+          'enforcement_actions': '/api/enforcement-actions', 'risk_scores': '/api/risk-scores',
+          'risk_signals': '/api/risk-signals', 'audit_logs': '/api/audit-logs'}
+RETRYABLE = {0, 401, 429, 500, 502, 503, 504}
+
+
+def iso(t):
+    """zod's datetime(): UTC with a Z suffix."""
+    return t.strftime('%Y-%m-%dT%H:%M:%S.') + f'{t.microsecond // 1000:03d}Z'
+
+
+def rng_for(state, *key):
+    return random.Random(':'.join(map(str, (state['seed'], state['tag']) + key)))
+
+
+def schedule(state):
+    """Kind of every work item, shuffled once per run so each batch mixes messages, bookings and transactions."""
+    plan = state['plan']
+    kinds = ['message'] * plan['messages'] + ['booking'] * plan['bookings'] + ['transaction'] * plan['transactions']
+    rng_for(state, 'schedule').shuffle(kinds)
+    return kinds
+
+
+def registrations(state, batch):
+    """Webhook bodies for registration batch `batch`: providers first, then each client's first booking."""
+    plan, size, tag = state['plan'], state['plan']['batch'], state['tag']
+    rng = rng_for(state, 'register', batch)
+    now = datetime.now(timezone.utc)
+    out = []
+    for i in range(batch * size, min((batch + 1) * size, plan['providers'] + plan['clients'])):
+        if i < plan['providers']:
+            event_type, ext = 'provider-register', f'{tag}-p{i}'
+            payload = {'provider_id': ext, 'user_id': ext, 'service_category': rng.choice(SERVICES)}
+        else:
+            event_type, ext = 'booking-create', f'{tag}-c{i - plan["providers"]}'
+            payload = {'booking_id': f'{tag}-b{i}', 'customer_id': ext,
+                       'provider_id': f'{tag}-p{rng.randrange(plan["providers"])}',
+                       'service_category': rng.choice(SERVICES), 'amount': round(rng.uniform(40, 400), 2),
+                       'currency': 'USD', 'status': 'pending',
+                       'scheduled_at': iso(now + timedelta(hours=rng.randrange(2, 500)))}
+        doc = {'event_id': f'{tag}-reg-{i}', 'event_type': event_type, 'timestamp': iso(now),
+               'source': 'qwickservices', 'payload': payload}
+        out.append((event_type, json.dumps(doc, separators=(',', ':'), ensure_ascii=False).encode()))
+    return out
+
+
+def events(state, kinds, batch):
+    """(type, body, carries contact info) for every event of work batch `batch`."""
+    size, users = state['plan']['batch'], state['users']
+    providers, clients = list(users['providers'].values()), list(users['clients'].values())
+    rng = rng_for(state, 'events', batch)
+    now = datetime.now(timezone.utc)
+    out = []
+
+    def add(event_type, payload, correlation, contact=False):
+        doc = {'id': str(uuid.UUID(int=rng.getrandbits(128), version=4)), 'type': event_type,
+               'correlation_id': correlation, 'timestamp': iso(now), 'payload': payload}
+        out.append((event_type, json.dumps(doc, separators=(',', ':'), ensure_ascii=False).encode(), contact))
+
+    for kind in kinds[batch * size:(batch + 1) * size]:
+        client, provider = rng.choice(clients), rng.choice(providers)
+        correlation = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        item = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        if kind == 'message':
+            sender, receiver = (client, provider) if rng.random() < 0.5 else (provider, client)
+            contact = rng.random() < state['plan']['contact_rate']
+            text = message(rng.choice(['phone', 'email']) if contact else 'clean', rng.randrange(60, 400), rng)
+            add('message.created', {'message_id': item, 'sender_id': sender, 'receiver_id': receiver,
+                                    'conversation_id': str(uuid.uuid5(uuid.NAMESPACE_OID, client + provider)),
+                                    'content': text}, correlation, contact)
+        elif kind == 'booking':
+            booking = {'booking_id': item, 'client_id': client, 'provider_id': provider,
+                       'service_category': rng.choice(SERVICES), 'amount': round(rng.uniform(40, 400), 2),
+                       'currency': 'USD', 'scheduled_at': iso(now + timedelta(hours=rng.randrange(2, 500)))}
+            add('booking.created', dict(booking, status='pending'), correlation)
+            outcome = rng.choices(['completed', 'cancelled', 'no_show'], [0.8, 0.15, 0.05])[0]
+            add(f'booking.{outcome}', dict(booking, status=outcome), correlation)
+        else:
+            tx = {'transaction_id': item, 'user_id': client, 'counterparty_id': provider,
+                  'amount': round(rng.uniform(40, 400), 2), 'currency': 'USD',
+                  'payment_method': rng.choices(*PAYMENT_METHODS)[0]}
+            add('transaction.initiated', dict(tx, status='pending'), correlation)
+            outcome = 'completed' if rng.random() < 0.9 else 'failed'
+            add(f'transaction.{outcome}', dict(tx, status=outcome), correlation)
+    return out
+
+
+class Seeder:
+    """Sends batches with retries and keeps the state file current; one instance per run."""
+
+    def __init__(self, state, path, args):
+        self.state = state
+        self.path = path
+        self.args = args
+        self.lock = threading.Lock()
+        self.token = None
+        self.saved = 0.0
+        self.statuses = collections.Counter()
+        self.batch_times = []
+        self.requests = 0
+        self.failed = 0
+
+    def save(self, force=False):
+        with self.lock:
+            if not force and time.monotonic() - self.saved < 1.0:
+                return
+            self.saved = time.monotonic()
+            data = json.dumps(self.state, separators=(',', ':'))
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix='.seed-', suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+    def headers(self, path, body):
+        if path == INGEST:
+            return {'Content-Type': 'application/json', 'X-Webhook-Signature': sign(body)}
+        return {'Content-Type': 'application/json', 'Authorization': 'Bearer ' + self.token}
+
+    def send(self, path, bodies):
+        """Pipelines `bodies` to `path`, re-sending what failed; returns the final status of each."""
+        statuses = [0] * len(bodies)
+        todo = list(range(len(bodies)))
+        t0 = time.perf_counter()
+        for attempt in range(self.args.retries + 1):
+            if attempt:
+                time.sleep(wait)
+            requests = [('POST', path, self.headers(path, bodies[i]), bodies[i]) for i in todo]
+            replies = td.POOL.pipeline(requests, self.args.timeout)
+            wait, again = 0.5 * 2 ** attempt, []
+            for i, (status, headers, _) in zip(todo, replies):
+                statuses[i] = status
+                if status in RETRYABLE:
+                    again.append(i)
+                if status == 429:
+                    wait = max(wait, retry_after(headers.get('retry-after')) or 0)
+                if status == 401 and path != INGEST:
+                    td.TOKENS.invalidate(td.BASE, td.ADMIN['email'])
+            with self.lock:
+                self.requests += len(replies)
+                self.statuses.update(s for _, (s, _, _) in zip(todo, replies))
+            if any(statuses[i] == 401 for i in again) and path != INGEST:
+                # A failed re-login keeps the old token; the batch then fails on its retries
+                self.token = td.login() or self.token
+            todo = again
+            if not todo:
+                break
+        with self.lock:
+            self.batch_times.append(time.perf_counter() - t0)
+        return statuses
+
+    def register(self, batch):
+        bodies = registrations(self.state, batch)
+        statuses = self.send(INGEST, [b for _, b in bodies])
+        ok = all(s in (200, 202) for s in statuses)
+        with self.lock:
+            if ok:
+                self.state['registered'].append(batch)
+            else:
+                self.failed += 1
+        self.save()
+
+    def emit(self, kinds, batch):
+        items = events(self.state, kinds, batch)
+        statuses = self.send(EVENTS, [b for _, b, _ in items])
+        ok = all(s == 202 for s in statuses)
+        with self.lock:
+            if ok:
+                accepted = self.state['accepted']
+                for event_type, _, contact in items:
+                    accepted[event_type] = accepted.get(event_type, 0) + 1
+                    self.state['contact_messages'] += contact
+                self.state['done'].append(batch)
+            else:
+                self.failed += 1
+        self.save()
+
+    def phase(self, title, work):
+        """Runs `work` (callables) on --parallel threads and prints the phase's throughput."""
+        self.statuses.clear()
+        self.batch_times, self.requests, self.failed = [], 0, 0
+        t0 = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.args.parallel) as pool:
+                for f in [pool.submit(w) for w in work]:
+                    f.result()
+        finally:
+            wall = time.perf_counter() - t0
+            with self.lock:
+                self.state['elapsed'] += wall
+        lat = summarize(self.batch_times)
+        codes = ', '.join(f'{"error" if s == 0 else s} x{n}' for s, n in sorted(self.statuses.items()))
+        print(f'\n  {title}: {len(work)} batch(es), {self.requests} request(s) in {wall:.1f}s '
+              f'= {self.requests / wall if wall else 0:.0f} req/s; batch p50 {lat["p50"]:.0f}ms p95 {lat["p95"]:.0f}ms '
+              f'max {lat["max"]:.0f}ms' + (f'\n    responses: {codes}' if codes else ''))
+        if self.failed:
+            print(f'    {self.failed} batch(es) still failing after {self.args.retries} retries; rerun to resume')
+        return not self.failed
+
+
+def totals(token):
+    out = {}
+    for key, path in TOTALS.items():
+        code, body = td.curl('GET', path + '?limit=1', token)
+        out[key] = (read_pagination(body) or {}).get('total', 0) if code == 200 else None
+    return out
+
+
+def resolve(state, token):
+    """Fills state['users'] from /api/users; returns how many seeded users are still unresolved."""
+    tag, plan = state['tag'], state['plan']
+    found = {}
+    for row in PageWalker(lambda path: td.curl('GET', path, token), '/api/users'):
+        ext = row.get('external_id') or ''
+        if ext.startswith(tag + '-'):
+            found[ext] = row['id']
+    state['users'] = {
+        'providers': {f'{tag}-p{i}': found[f'{tag}-p{i}'] for i in range(plan['providers']) if f'{tag}-p{i}' in found},
+        'clients': {f'{tag}-c{i}': found[f'{tag}-c{i}'] for i in range(plan['clients']) if f'{tag}-c{i}' in found}}
+    return plan['providers'] + plan['clients'] - len(state['users']['providers']) - len(state['users']['clients'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seed the CIS event pipeline with synthetic volume')
+    parser.add_argument('--providers', type=int, default=200)
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--messages', type=int, default=20000)
+    parser.add_argument('--bookings', type=int, default=4000, help='bookings (two events each)')
+    parser.add_argument('--transactions', type=int, default=4000, help='transactions (two events each)')
+    parser.add_argument('--contact-rate', type=float, default=0.05,
+                        help='share of messages that carry a phone number or email address')
+    parser.add_argument('--batch', type=int, default=50, help='work items pipelined per connection round trip')
+    parser.add_argument('--parallel', type=int, default=8, help='connections sending batches at once')
+    parser.add_argument('--retries', type=int, default=3, help='re-sends of throttled or failed requests per batch')
+    parser.add_argument('--timeout', type=float, default=None, help='per-batch socket timeout in seconds')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the generator')
+    parser.add_argument('--state', default=STATE_FILE, help=f'checkpoint file to resume from (default {STATE_FILE})')
+    parser.add_argument('--restart', action='store_true', help='ignore an existing --state file and start a new run')
+    parser.add_argument('--stub', action='store_true', help='seed an in-process cis_stub_server')
+    args = parser.parse_args(argv)
+    if args.providers < 1 or args.clients < 1 or args.batch < 1 or args.parallel < 1:
+        parser.error('--providers, --clients, --batch and --parallel must be at least 1')
+    if args.stub:
+        args.restart = True  # a fresh stub has none of an earlier run's users
+
+    td.connect(args.stub, size=args.parallel + 1)
+    token = td.login()
+    if token is None:
+        td.POOL.close()
+        return 1
+    if os.path.exists(args.state) and not args.restart:
+        with open(args.state, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('base') != td.BASE and not args.stub:
+            parser.error(f'{args.state} seeded {state.get("base")}, not {td.BASE}; pass --restart for a new run')
+        print(f'Resuming run {state["tag"]} from {args.state}: {len(state["registered"])} registration and '
+              f'{len(state["done"])} event batch(es) already done (plan options on the command line are ignored)')
+    else:
+        state = {'base': td.BASE, 'tag': f'seed-{uuid.uuid4().hex[:8]}', 'seed': args.seed,
+                 'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                 'plan': {'providers': args.providers, 'clients': args.clients, 'messages': args.messages,
+                          'bookings': args.bookings, 'transactions': args.transactions,
+                          'contact_rate': args.contact_rate, 'batch': args.batch},
+                 'before': totals(token), 'registered': [], 'users': {'providers': {}, 'clients': {}},
+                 'done': [], 'accepted': {}, 'contact_messages': 0, 'elapsed': 0.0}
+    plan = state['plan']
+    seeder = Seeder(state, args.state, args)
+    seeder.token = token
+    seeder.save(force=True)
+
+    print('=' * 60)
+    print(f'CIS EVENT SEEDER -- run {state["tag"]} against {td.BASE}')
+    print(f'  {plan["providers"]} providers, {plan["clients"]} clients; {plan["messages"]} messages, '
+          f'{plan["bookings"]} bookings, {plan["transactions"]} transactions; batches of {plan["batch"]}, '
+          f'{args.parallel} connection(s)')
+    print('=' * 60)
+    ok = True
+    try:
+        users = plan['providers'] + plan['clients']
+        pending = set(range(-(-users // plan['batch']))) - set(state['registered'])
+        # Providers must exist before the bookings that register clients name them
+        first = -(-plan['providers'] // plan['batch'])
+        for title, batches in (('register providers', sorted(b for b in pending if b < first)),
+                               ('register clients', sorted(b for b in pending if b >= first))):
+            if batches and ok:
+                ok = seeder.phase(title, [lambda b=b: seeder.register(b) for b in batches])
+        if not ok:
+            return 1
+        missing = resolve(state, token)
+        if missing:
+            print(f'\n  {missing} registered user(s) not found in /api/users; rerun to resume')
+            return 1
+        kinds = schedule(state)
+        pending = sorted(set(range(-(-len(kinds) // plan['batch']))) - set(state['done']))
+        if pending:
+            ok = seeder.phase('events', [lambda b=b: seeder.emit(kinds, b) for b in pending])
+    except KeyboardInterrupt:
+        print(f'\nInterrupted; progress saved to {args.state}')
+        return 130
+    finally:
+        seeder.save(force=True)
+        td.POOL.close()
+
+    accepted = state['accepted']
+    print('\n' + '=' * 60)
+    print(f'Seeded {users} user(s) and {sum(accepted.values())} event(s) in {state["elapsed"]:.1f}s '
+          f'({sum(accepted.values()) / state["elapsed"] if state["elapsed"] else 0:.0f} events/s overall); '
+          f'{state["contact_messages"]} message(s) carry contact info')
+    for event_type, n in sorted(accepted.items()):
+        print(f'  {event_type:<24}{n:>9}')
+    if not args.stub:
+        print(f'State in {args.state}; check it with: python test_dashboard.py --scale {args.state}')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())